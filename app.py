@@ -49,6 +49,14 @@ with col1:
     if st.button("Go to Dashboard →", use_container_width=True):
         st.switch_page("pages/dashboard.py")
 
+with col2:
+    st.markdown("""
+    ### Audit Log
+    Browse and export the full history of Phase-2 decisions
+    """)
+    if st.button("Go to Audit Log →", use_container_width=True):
+        st.switch_page("pages/audit_log.py")
+
 st.markdown("---")
 
 # Features showcase
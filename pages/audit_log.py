@@ -0,0 +1,172 @@
+import os
+import tempfile
+import time
+import uuid
+
+import streamlit as st
+import pandas as pd
+
+from utils.analyzer import ALLOWED_CATEGORIES
+from utils.archive import fetch_decision_log_page
+from utils.exporter import AUDIT_EXPORT_FORMATS, export_decision_log
+
+PAGE_SIZE = 50
+
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "customer_insight_exports")
+
+# Exports that were prepared but never downloaded are removed after this
+EXPORT_TTL_SECONDS = 60 * 60
+
+# Streamlit holds a download in server memory while it is served, so
+# larger exports are refused rather than offered
+EXPORT_MAX_BYTES = 100 * 1024 * 1024
+
+EXPORT_MIME_TYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/jsonl",
+    "parquet": "application/vnd.apache.parquet"
+}
+
+# ---------------- PAGE SETUP ----------------
+
+st.set_page_config(
+    page_title="Audit Log",
+    page_icon="📜",
+    layout="wide"
+)
+
+st.title("Decision Audit Log")
+
+# ---------------- FILTERS ----------------
+
+with st.sidebar:
+    st.header("Filters")
+    category = st.selectbox("Issue category:", ["all"] + ALLOWED_CATEGORIES)
+    date_range = st.date_input("Date range:", value=())
+
+filters = {
+    "category": None if category == "all" else category,
+    "since": None,
+    "until": None
+}
+
+if len(date_range) == 2:
+    filters["since"] = date_range[0].isoformat()
+    filters["until"] = (date_range[1] + pd.Timedelta(days=1)).isoformat()
+
+# ---------------- SESSION STATE ----------------
+
+# Keyset cursors of the pages visited so far, newest first.
+# Resetting on filter change keeps cursors consistent with the query.
+if st.session_state.get("audit_filters") != filters:
+    st.session_state.audit_filters = filters
+    st.session_state.audit_cursors = [None]
+
+cursors = st.session_state.audit_cursors
+
+# ---------------- BROWSE ----------------
+
+page = fetch_decision_log_page(
+    cursor_id=cursors[-1],
+    limit=PAGE_SIZE,
+    descending=True,
+    **filters
+)
+
+if page:
+    st.dataframe(pd.DataFrame(page), use_container_width=True, hide_index=True)
+else:
+    st.info("No decisions match the current filters.")
+
+st.caption(f"Page {len(cursors)} · newest first · includes archived decisions")
+
+col1, col2 = st.columns(2)
+
+with col1:
+    if st.button("← Newer", disabled=len(cursors) == 1, use_container_width=True):
+        cursors.pop()
+        st.rerun()
+
+with col2:
+    if st.button("Older →", disabled=len(page) < PAGE_SIZE, use_container_width=True):
+        cursors.append(page[-1]["id"])
+        st.rerun()
+
+# ---------------- EXPORT ----------------
+
+def cleanup_exports():
+    if not os.path.isdir(EXPORT_DIR):
+        return
+
+    cutoff = time.time() - EXPORT_TTL_SECONDS
+    for name in os.listdir(EXPORT_DIR):
+        path = os.path.join(EXPORT_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except FileNotFoundError:
+            # Downloaded or cleaned up by another session meanwhile
+            pass
+
+
+def read_and_remove(path):
+    """
+    Download callable: the export file is deleted once it is served.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    os.remove(path)
+    return data
+
+
+def clear_export():
+    st.session_state.audit_export = None
+
+
+cleanup_exports()
+
+st.markdown("---")
+st.subheader("Export Audit Log")
+st.caption("Includes archived partitions. Filters above apply.")
+
+export_format = st.selectbox("Format:", AUDIT_EXPORT_FORMATS)
+
+if st.button("Prepare Export", type="primary"):
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    export_path = os.path.join(
+        EXPORT_DIR,
+        f"decision_log_{pd.Timestamp.now():%Y%m%d_%H%M%S}_"
+        f"{uuid.uuid4().hex[:8]}.{export_format}"
+    )
+    with st.spinner("Exporting..."):
+        rows = export_decision_log(export_path, export_format, **filters)
+
+    size = os.path.getsize(export_path)
+    if size > EXPORT_MAX_BYTES:
+        os.remove(export_path)
+        clear_export()
+        st.warning(
+            f"The export is {size / 2**20:.0f} MB, over the "
+            f"{EXPORT_MAX_BYTES // 2**20} MB download limit. "
+            "Narrow the date range or category, or choose parquet."
+        )
+    else:
+        st.session_state.audit_export = (export_path, export_format, rows)
+
+if st.session_state.get("audit_export"):
+    export_path, fmt, rows = st.session_state.audit_export
+
+    if os.path.exists(export_path):
+        size = os.path.getsize(export_path)
+        st.success(f"Exported {rows} decisions ({size / 2**20:.1f} MB)")
+        # The file is read only when the button is clicked
+        st.download_button(
+            f"Download {fmt.upper()}",
+            lambda: read_and_remove(export_path),
+            file_name=os.path.basename(export_path),
+            mime=EXPORT_MIME_TYPES[fmt],
+            on_click=clear_export,
+            use_container_width=True,
+        )
+    else:
+        clear_export()
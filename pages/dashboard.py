@@ -1,12 +1,37 @@
+import uuid
+
 import streamlit as st
 import pandas as pd
 
-from utils.analyzer import analyze_with_fallback, phase2_process
+from utils.analyzer import (
+    analyze_with_fallback,
+    log_analysis_run,
+    log_review_results,
+    phase2_process,
+    ALLOWED_CATEGORIES,
+)
+from utils.db import (
+    REVIEW_RESULTS_RETENTION_DAYS,
+    count_review_results,
+    fetch_review_page,
+    get_sentiment_trend,
+    list_review_runs,
+)
 from utils.exporter import (
     export_to_csv,
     export_to_excel,
     create_markdown_report,
 )
+from utils.spool import (
+    ReviewSpool,
+    cleanup_spool,
+    has_reviews,
+    spool_reviews,
+)
+
+REVIEW_PAGE_SIZE = 50
+
+CSV_CHUNK_ROWS = 10000
 
 # ---------------- PAGE SETUP ----------------
 
@@ -26,6 +51,10 @@ with st.sidebar:
         "Choose input method:",
         ["Text Input", "Upload CSV/Excel"]
     )
+    stream_results = st.checkbox(
+        "Stream results while analyzing",
+        value=True
+    )
 
 # ---------------- SESSION STATE ----------------
 
@@ -38,13 +67,56 @@ if "analysis_source" not in st.session_state:
 if "phase2_result" not in st.session_state:
     st.session_state.phase2_result = None
 
-if "reviews_text" not in st.session_state:
-    st.session_state.reviews_text = ""
+# Text input, or a ReviewSpool handle for uploads (never the upload itself)
+if "reviews" not in st.session_state:
+    st.session_state.reviews = ""
+
+# The input the current results were computed from
+if "analyzed_reviews" not in st.session_state:
+    st.session_state.analyzed_reviews = ""
+
+if "spool_id" not in st.session_state:
+    st.session_state.spool_id = uuid.uuid4().hex
+
+if "spool_key" not in st.session_state:
+    st.session_state.spool_key = None
+
+if "run_id" not in st.session_state:
+    st.session_state.run_id = None
 
 reviews_input = ""
 
+cleanup_spool()
+
+
+def clear_results():
+    st.session_state.analysis_result = None
+    st.session_state.analyzed_reviews = ""
+    st.session_state.run_id = None
+
+
 # ---------------- INPUT ----------------
 
+def read_review_column(uploaded_file, column):
+    """
+    Yield one column of an upload without keeping the DataFrame.
+    CSVs are read in chunks; Excel is read one column at a time.
+    """
+
+    uploaded_file.seek(0)
+
+    if uploaded_file.name.endswith(".csv"):
+        for chunk in pd.read_csv(
+            uploaded_file,
+            usecols=[column],
+            chunksize=CSV_CHUNK_ROWS
+        ):
+            yield from chunk[column].dropna().astype(str)
+    else:
+        df = pd.read_excel(uploaded_file, usecols=[column])
+        yield from df[column].dropna().astype(str)
+
+
 if input_method == "Text Input":
     reviews_input = st.text_area(
         "Enter customer reviews (one per line):",
@@ -56,7 +128,8 @@ if input_method == "Text Input":
             "Excellent customer service!"
         ),
     )
-    st.session_state.reviews_text = reviews_input
+    st.session_state.reviews = reviews_input
+    st.session_state.spool_key = None
 
 else:
     uploaded_file = st.file_uploader(
@@ -67,25 +140,44 @@ else:
     if uploaded_file:
         try:
             if uploaded_file.name.endswith(".csv"):
-                df = pd.read_csv(uploaded_file)
+                preview = pd.read_csv(uploaded_file, nrows=5)
             else:
-                df = pd.read_excel(uploaded_file)
+                preview = pd.read_excel(uploaded_file, nrows=5)
 
-            st.success(f"Loaded {len(df)} rows")
-            st.dataframe(df.head(), use_container_width=True)
+            st.dataframe(preview, use_container_width=True)
 
             review_column = st.selectbox(
                 "Select column containing reviews:",
-                df.columns
+                preview.columns
             )
 
             if review_column:
-                reviews_input = "\n".join(
-                    df[review_column].astype(str).tolist()
-                )
-                st.session_state.reviews_text = reviews_input
-                st.info(
-                    f"Loaded {len(df)} reviews from column '{review_column}'"
+                # Spool once per file and column, not on every rerun.
+                # Spool again if cleanup removed it while the session idled.
+                spool_key = (uploaded_file.file_id, review_column)
+
+                if (
+                    st.session_state.spool_key != spool_key
+                    or not st.session_state.reviews.exists()
+                ):
+                    # A new upload overwrites the session's spool file,
+                    # which exports of the previous results still read
+                    if (
+                        st.session_state.spool_key != spool_key
+                        and isinstance(st.session_state.analyzed_reviews, ReviewSpool)
+                    ):
+                        clear_results()
+
+                    st.session_state.reviews = spool_reviews(
+                        st.session_state.spool_id,
+                        read_review_column(uploaded_file, review_column)
+                    )
+                    st.session_state.spool_key = spool_key
+
+                reviews_input = st.session_state.reviews
+                reviews_input.touch()
+                st.success(
+                    f"Loaded {len(reviews_input)} reviews from column '{review_column}'"
                 )
 
         except Exception as e:
@@ -99,13 +191,50 @@ analyze_button = st.button(
     use_container_width=True
 )
 
-if analyze_button and reviews_input.strip():
+def render_partial(placeholder, partial):
+    """
+    Render whatever parts of the Phase-1 output have completed so far.
+    """
+
+    with placeholder.container():
+        sentiment = partial.get("sentiment_distribution")
+        if sentiment:
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Positive", f"{sentiment['positive']}%")
+            col2.metric("Negative", f"{sentiment['negative']}%")
+            col3.metric("Neutral", f"{sentiment['neutral']}%")
+
+        if partial.get("urgency"):
+            st.markdown(f"**Urgency Level:** {partial['urgency'].capitalize()}")
+
+        if partial.get("key_themes"):
+            st.markdown("**Key Themes (so far)**")
+            for theme in partial["key_themes"]:
+                st.write(f"- {theme}")
+
+
+if analyze_button and has_reviews(reviews_input):
     with st.spinner("Analyzing reviews..."):
-        analysis, source = analyze_with_fallback(reviews_input)
+        on_update = None
+        if stream_results:
+            partial_placeholder = st.empty()
+            on_update = lambda partial: render_partial(
+                partial_placeholder, partial
+            )
+
+        analysis, source = analyze_with_fallback(reviews_input, on_update)
+
+        if on_update is not None:
+            partial_placeholder.empty()
 
         if analysis:
             st.session_state.analysis_result = analysis
             st.session_state.analysis_source = source
+            st.session_state.analyzed_reviews = reviews_input
+
+            run_id = log_analysis_run(analysis, source, reviews_input)
+            log_review_results(run_id, reviews_input)
+            st.session_state.run_id = run_id
 
             # -------- Phase 2 decision --------
             st.session_state.phase2_result = phase2_process(analysis)
@@ -116,6 +245,13 @@ if analyze_button and reviews_input.strip():
 
 # ---------------- RESULTS ----------------
 
+# Results of an upload whose spool expired cannot be exported any more
+if (
+    isinstance(st.session_state.analyzed_reviews, ReviewSpool)
+    and not st.session_state.analyzed_reviews.exists()
+):
+    clear_results()
+
 if st.session_state.analysis_result:
     st.markdown("---")
 
@@ -167,52 +303,38 @@ if st.session_state.analysis_result:
     st.write(f"**Escalation Level:** {phase2['escalation']['level']}")
     st.write(f"**Escalation Reason:** {phase2['escalation']['reason']}")
 
-    
-
     # ---------------- EXPORT ----------------
 
     st.markdown("---")
     st.subheader("Export Results")
 
+    # Exports are built only when a download is clicked, not on every rerun
+    reviews = st.session_state.analyzed_reviews
+
     col1, col2, col3 = st.columns(3)
 
     with col1:
-        csv_data = export_to_csv(
-            analysis,
-            st.session_state.reviews_text,
-            phase2
-        )
         st.download_button(
             "Download CSV",
-            csv_data,
+            lambda: export_to_csv(analysis, reviews, phase2),
             file_name=f"analysis_{pd.Timestamp.now():%Y%m%d_%H%M%S}.csv",
             mime="text/csv",
             use_container_width=True,
         )
 
     with col2:
-        excel_data = export_to_excel(
-            analysis,
-            st.session_state.reviews_text,
-            phase2
-        )
         st.download_button(
             "Download Excel",
-            excel_data,
+            lambda: export_to_excel(analysis, reviews, phase2),
             file_name=f"analysis_{pd.Timestamp.now():%Y%m%d_%H%M%S}.xlsx",
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             use_container_width=True,
         )
 
     with col3:
-        markdown_data = create_markdown_report(
-            analysis,
-            st.session_state.reviews_text,
-            phase2
-        )
         st.download_button(
             "Download Report (MD)",
-            markdown_data,
+            lambda: create_markdown_report(analysis, reviews, phase2),
             file_name=f"report_{pd.Timestamp.now():%Y%m%d_%H%M%S}.md",
             mime="text/markdown",
             use_container_width=True,
@@ -221,4 +343,105 @@ if st.session_state.analysis_result:
 else:
     st.info(
         "Enter reviews above and click **Analyze Reviews** to get started!"
-    )
\ No newline at end of file
+    )
+
+# ---------------- REVIEW DRILL-DOWN ----------------
+
+# Results are stored with their text, so any retained run can be
+# browsed, including runs from earlier sessions
+review_runs = {run["id"]: run for run in list_review_runs()}
+
+if review_runs:
+    st.markdown("---")
+    st.subheader("Review Drill-down")
+    st.caption(
+        "Per-review labels from the heuristic scorer, "
+        f"kept for {REVIEW_RESULTS_RETENTION_DAYS} days."
+    )
+
+    run_ids = list(review_runs)
+    review_run_id = st.selectbox(
+        "Run:",
+        run_ids,
+        index=(
+            run_ids.index(st.session_state.run_id)
+            if st.session_state.run_id in review_runs else 0
+        ),
+        format_func=lambda run_id: (
+            f"#{run_id} · {review_runs[run_id]['timestamp'][:16]} · "
+            f"{review_runs[run_id]['review_count']} reviews "
+            f"({review_runs[run_id]['source']})"
+        )
+    )
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        labels = st.multiselect(
+            "Sentiment:",
+            ["positive", "negative", "neutral"]
+        )
+    with col2:
+        review_category = st.selectbox(
+            "Category:",
+            ["all"] + ALLOWED_CATEGORIES
+        )
+    with col3:
+        sort_option = st.selectbox(
+            "Sort by:",
+            ["Original order", "Most negative", "Most positive"]
+        )
+
+    review_filters = {
+        "labels": labels,
+        "category": None if review_category == "all" else review_category
+    }
+
+    total = count_review_results(review_run_id, **review_filters)
+    pages = max(1, -(-total // REVIEW_PAGE_SIZE))
+
+    page_number = st.number_input(
+        f"Page (of {pages}):",
+        min_value=1,
+        max_value=pages,
+        value=1
+    )
+
+    review_page = fetch_review_page(
+        review_run_id,
+        order_by="review_index" if sort_option == "Original order" else "sentiment_score",
+        descending=sort_option == "Most positive",
+        limit=REVIEW_PAGE_SIZE,
+        offset=(page_number - 1) * REVIEW_PAGE_SIZE,
+        **review_filters
+    )
+
+    st.caption(f"{total} matching reviews")
+    if review_page:
+        st.dataframe(
+            pd.DataFrame(review_page),
+            use_container_width=True,
+            hide_index=True
+        )
+
+# ---------------- SENTIMENT TREND ----------------
+
+st.markdown("---")
+st.subheader("Sentiment Trend")
+
+trend_resolution = st.selectbox(
+    "Resolution:",
+    ["day", "hour", "minute"]
+)
+
+trend = get_sentiment_trend(trend_resolution)
+
+if trend:
+    trend_df = pd.DataFrame(trend).set_index("bucket")
+    st.line_chart(trend_df[["positive", "negative", "neutral"]])
+    st.caption(
+        f"{int(trend_df['runs'].sum())} runs, "
+        f"{int(trend_df['reviews'].sum())} reviews"
+    )
+else:
+    st.info("No analysis runs recorded yet.")
@@ -0,0 +1,17 @@
+import pytest
+
+from utils import archive, db
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """
+    Point the database and the archive at a fresh temporary directory.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(db, "DB_PATH", str(tmp_path / "data" / "app.db"))
+    monkeypatch.setattr(
+        archive, "ARCHIVE_DIR", str(tmp_path / "data" / "archive" / "decision_log")
+    )
+    db.init_db()
+    return tmp_path
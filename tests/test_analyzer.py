@@ -0,0 +1,23 @@
+import pytest
+
+from utils.analyzer import categorize_review, score_review
+
+
+@pytest.mark.parametrize("review, category", [
+    ("Very happy with it", "other"),
+    ("Apparently fine", "other"),
+    ("Translate please", "other"),
+    ("They must make billions", "other"),
+    ("The app keeps crashing", "app"),
+    ("Shipping took two weeks", "delivery"),
+    ("It was never delivered", "delivery"),
+    ("Still waiting for my refund", "billing"),
+    ("I was billed twice", "billing"),
+])
+def test_categorize_review_matches_whole_tokens(review, category):
+    assert categorize_review(review) == category
+
+
+def test_score_review_matches_whole_tokens():
+    assert score_review("Unhappy with the badge") == ("neutral", 0.0)
+    assert score_review("Great, but the box was bad and poor") == ("negative", -1 / 3)
@@ -0,0 +1,84 @@
+from datetime import datetime
+
+import pandas as pd
+
+from utils import archive, db
+from utils.archive import compact_decision_log, fetch_decision_log_page
+from utils.exporter import export_decision_log
+
+
+def decision(timestamp, category="billing"):
+    return {
+        "timestamp": timestamp,
+        "issue_category": {"category": category, "confidence": 0.9},
+        "escalation": {"level": "none", "reason": "test"}
+    }
+
+
+def insert_across_midnight():
+    # Timestamps are taken before the insert, so a lower id can land
+    # in a later day's partition
+    db.insert_decision(decision("2020-08-02T00:00:00.001"))
+    db.insert_decision(decision("2020-08-01T23:59:59.999"))
+    db.insert_decision(decision("2020-08-02T00:00:01.000"))
+
+
+def browse(descending, limit):
+    ids, cursor = [], None
+    while True:
+        page = fetch_decision_log_page(cursor, limit, descending=descending)
+        if not page:
+            return ids
+        ids += [row["id"] for row in page]
+        cursor = page[-1]["id"]
+
+
+def test_export_keeps_lower_id_in_later_partition(temp_db):
+    insert_across_midnight()
+    assert compact_decision_log(vacuum=False) == 3
+
+    rows = export_decision_log(str(temp_db / "out.csv"), "csv")
+
+    assert rows == 3
+    assert sorted(pd.read_csv(temp_db / "out.csv")["id"]) == [1, 2, 3]
+
+
+def test_browse_keeps_lower_id_in_later_partition(temp_db):
+    insert_across_midnight()
+    compact_decision_log(vacuum=False)
+    db.insert_decision(decision(datetime.utcnow().isoformat()))
+
+    for limit in (1, 2, 10):
+        assert browse(True, limit) == [4, 3, 2, 1]
+        assert browse(False, limit) == [1, 2, 3, 4]
+
+
+def test_rows_in_archive_and_live_table_appear_once(temp_db):
+    insert_across_midnight()
+    compact_decision_log(vacuum=False)
+
+    # An interrupted compaction leaves rows in both places
+    conn = db.get_connection()
+    conn.execute(
+        "INSERT INTO decision_log (id, timestamp, issue_category) "
+        "VALUES (1, '2020-08-02T00:00:00.001', 'billing')"
+    )
+    conn.commit()
+    conn.close()
+
+    assert browse(True, 2) == [3, 2, 1]
+    assert export_decision_log(str(temp_db / "out.jsonl"), "jsonl") == 3
+
+
+def test_compaction_in_batches_moves_every_old_row(temp_db, monkeypatch):
+    monkeypatch.setattr(archive, "COMPACTION_BATCH_ROWS", 4)
+    for second in range(10):
+        db.insert_decision(decision(f"2020-08-01T00:00:{second:02d}"))
+    db.insert_decision(decision(datetime.utcnow().isoformat()))
+
+    assert compact_decision_log(vacuum=False) == 10
+
+    parts = archive.partition_files("2020-08-01")
+    assert [archive.part_id_range(p) for p in parts] == [(1, 4), (5, 8), (9, 10)]
+    assert [row["id"] for row in db.fetch_decision_page()] == [11]
+    assert browse(False, 3) == list(range(1, 12))
@@ -0,0 +1,132 @@
+import json
+
+import pytest
+
+from utils import analyzer
+from utils.json_stream import IncrementalJSONParser, SchemaViolation, parse_json_object
+
+VALID_ANALYSIS = {
+    "sentiment_distribution": {"positive": 60, "negative": 30, "neutral": 10},
+    "top_pain_points": ["Slow shipping"],
+    "top_positive_drivers": ["Friendly support"],
+    "key_themes": ["Delivery", "Support"],
+    "urgency": "medium",
+    "recommended_actions": ["Review courier SLAs"]
+}
+
+
+def test_ignores_trailing_prose():
+    text = 'Here you go: {"a": 1, "b": "}"} and a stray } after'
+    assert parse_json_object(text) == {"a": 1, "b": "}"}
+
+
+def test_member_without_colon_raises():
+    with pytest.raises(json.JSONDecodeError):
+        parse_json_object('{"a" 1}')
+
+
+def test_leftover_text_in_value_raises():
+    with pytest.raises(json.JSONDecodeError):
+        parse_json_object('{"a": 1 2}')
+
+
+def test_brace_in_prose_before_object():
+    text = "Note: {see below}\n" + json.dumps(VALID_ANALYSIS)
+    assert parse_json_object(text) == VALID_ANALYSIS
+
+
+def test_unclosed_brace_in_prose_before_object():
+    text = "Note: {see below\n" + json.dumps(VALID_ANALYSIS)
+    assert parse_json_object(text) == VALID_ANALYSIS
+
+
+def test_empty_object():
+    assert parse_json_object("{}") == {}
+
+
+def test_no_object_raises():
+    with pytest.raises(json.JSONDecodeError):
+        parse_json_object("no json here")
+
+
+def test_streamed_events_in_order():
+    parser = IncrementalJSONParser()
+    text = '{"a": {"x": 1}, "b": ["q,]", "r"], "c": "hi"}'
+
+    events = []
+    for i in range(0, len(text), 3):
+        events.extend(parser.feed(text[i:i + 3]))
+
+    assert events == [
+        ("field", "a", {"x": 1}),
+        ("item", "b", "q,]"),
+        ("item", "b", "r"),
+        ("field", "b", ["q,]", "r"]),
+        ("field", "c", "hi")
+    ]
+    assert parser.close() == {"a": {"x": 1}, "b": ["q,]", "r"], "c": "hi"}
+
+
+def test_schema_violation_fails_fast():
+    parser = IncrementalJSONParser(validate=analyzer.validate_analysis_event)
+
+    with pytest.raises(SchemaViolation):
+        parser.feed('{"urgency": "extreme", "key_themes": [')
+
+
+def test_validate_analysis_rejects_empty_object():
+    with pytest.raises(SchemaViolation):
+        analyzer.validate_analysis({})
+
+
+def test_analyze_reviews_falls_back_on_invalid_output(monkeypatch):
+    class BadModel:
+        def __init__(self, model_name=None):
+            pass
+
+        def generate_content(self, prompt, stream=False):
+            class Response:
+                text = '{"a" 1}'
+            return Response()
+
+    monkeypatch.setattr(analyzer, "configure_gemini", lambda: True)
+    monkeypatch.setattr(analyzer.genai, "GenerativeModel", BadModel)
+
+    analysis, source = analyzer.analyze_with_fallback("Great product")
+
+    assert source == "heuristic"
+    assert set(analysis) == set(analyzer.REQUIRED_FIELDS)
+
+
+def test_unclosed_prose_brace_streams_before_close():
+    parser = IncrementalJSONParser(validate=analyzer.validate_analysis_event)
+
+    events = parser.feed('Note {see below\n{"urgency": "high", "key_themes": [')
+
+    assert events == [("field", "urgency", "high")]
+
+
+def test_unclosed_prose_brace_fails_fast():
+    parser = IncrementalJSONParser(validate=analyzer.validate_analysis_event)
+
+    with pytest.raises(SchemaViolation):
+        parser.feed('Note {see below\n{"urgency": "extreme", ')
+
+
+def test_error_after_events_is_not_retried():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"a": 1, ') == [("field", "a", 1)]
+
+    # "a" already reached the caller, so the later object is not used
+    with pytest.raises(json.JSONDecodeError):
+        parser.feed('"b": oops} {"c": 2}')
+
+
+def test_trailing_comma_in_object_raises():
+    with pytest.raises(json.JSONDecodeError):
+        parse_json_object('{"a": 1,}')
+
+
+def test_trailing_comma_in_array_raises():
+    with pytest.raises(json.JSONDecodeError):
+        parse_json_object('{"a": [1,]}')
@@ -0,0 +1,55 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+from utils import db
+
+ROW = ("Great product", "positive", 1.0, "product")
+
+
+def insert_run(days_ago=0):
+    timestamp = datetime.utcnow() - timedelta(days=days_ago)
+    return db.insert_sentiment_run({
+        "timestamp": timestamp.isoformat(),
+        "source": "heuristic",
+        "sentiment_distribution": {"positive": 100, "negative": 0, "neutral": 0},
+        "urgency": "low",
+        "review_count": 1
+    })
+
+
+def test_results_are_kept_for_many_recent_runs(temp_db):
+    run_ids = [insert_run() for _ in range(50)]
+    for run_id in run_ids:
+        db.insert_review_results(run_id, [(0, *ROW)])
+
+    assert db.fetch_review_page(run_ids[0])[0]["review"] == "Great product"
+    assert len(db.list_review_runs(limit=100)) == 50
+
+
+def test_results_older_than_retention_are_pruned(temp_db):
+    old_run = insert_run(days_ago=db.REVIEW_RESULTS_RETENTION_DAYS + 1)
+    db.insert_review_results(old_run, [(0, *ROW)])
+
+    new_run = insert_run()
+    db.insert_review_results(new_run, [(0, *ROW)])
+
+    assert db.count_review_results(old_run) == 0
+    assert db.count_review_results(new_run) == 1
+    assert [run["id"] for run in db.list_review_runs()] == [new_run]
+
+
+def test_init_db_adds_missing_review_column(temp_db):
+    conn = sqlite3.connect(db.DB_PATH)
+    conn.execute("DROP TABLE review_results")
+    conn.execute(
+        "CREATE TABLE review_results (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "run_id INTEGER, review_index INTEGER, sentiment_label TEXT, "
+        "sentiment_score REAL, category TEXT)"
+    )
+    conn.commit()
+    conn.close()
+
+    db.init_db()
+    db.insert_review_results(insert_run(), [(0, *ROW)])
+
+    assert db.fetch_review_page(1)[0]["review"] == "Great product"
@@ -0,0 +1,86 @@
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+
+from utils import db
+from utils.archive import compact_decision_log
+
+CATEGORIES = ["billing", "delivery", "app", "billing", "support"]
+
+
+def decision(index, timestamp=None):
+    return {
+        "timestamp": timestamp or datetime.utcnow().isoformat(),
+        "issue_category": {"category": CATEGORIES[index % len(CATEGORIES)], "confidence": 0.9},
+        "escalation": {"level": "high" if index == 3 else "none", "reason": "test"}
+    }
+
+
+def expected_counts(n):
+    return dict(Counter(CATEGORIES[i % len(CATEGORIES)] for i in range(n)))
+
+
+def test_replay_across_checkpoint_matches_full_recount(temp_db, monkeypatch):
+    monkeypatch.setattr(db, "CHECKPOINT_INTERVAL", 5)
+
+    for i in range(12):
+        db.record_decision(decision(i))
+
+    conn = db.get_connection()
+    checkpoints = [row[0] for row in conn.execute(
+        "SELECT last_log_id FROM state_checkpoint ORDER BY last_log_id"
+    )]
+    recount = dict(conn.execute(
+        "SELECT issue_category, COUNT(*) FROM decision_log GROUP BY issue_category"
+    ).fetchall())
+    conn.close()
+
+    last_id, state = db.replay_state()
+
+    assert checkpoints == [5, 10]
+    assert last_id == 12
+    assert state["issue_counts"] == recount == expected_counts(12)
+    assert state["escalation_active"] is True
+    assert db.get_state("issue_counts") == recount
+    assert db.verify_state() == []
+
+
+def test_replay_after_compaction(temp_db):
+    old = (datetime.utcnow() - timedelta(days=60)).isoformat()
+    for i in range(7):
+        db.record_decision(decision(i, old))
+    for i in range(7, 10):
+        db.record_decision(decision(i))
+
+    assert compact_decision_log(vacuum=False) == 7
+
+    _, state = db.replay_state()
+
+    assert state["issue_counts"] == expected_counts(10)
+    assert db.verify_state() == []
+
+
+def test_verify_state_repairs_stale_issue_counts(temp_db):
+    for i in range(4):
+        db.record_decision(decision(i))
+
+    db.set_state("issue_counts", {"billing": 99})
+
+    assert db.verify_state() == ["issue_counts"]
+    assert db.get_state("issue_counts") == expected_counts(4)
+    assert db.verify_state() == []
+
+
+def test_concurrent_decisions_are_not_lost(temp_db):
+    def worker():
+        for i in range(20):
+            db.record_decision(decision(i))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(db.get_state("issue_counts").values()) == 80
+    assert db.verify_state() == []
@@ -3,7 +3,18 @@ import streamlit as st
 import google.generativeai as genai
 from datetime import datetime
 
-from utils.db import get_state, set_state, insert_decision
+from utils.db import (
+    record_decision,
+    insert_sentiment_run,
+    insert_review_results,
+)
+from utils.json_stream import (
+    IncrementalJSONParser,
+    SchemaViolation,
+    parse_json_object,
+)
+from utils.sampler import TOKEN_PATTERN, representative_sample
+from utils.spool import ReviewSpool, count_reviews, iter_reviews
 # ---------------- PHASE 2 CONSTANTS ----------------
 
 ALLOWED_CATEGORIES = [
@@ -22,6 +33,60 @@ ALLOWED_ESCALATION_LEVELS = [
     "escalate"
 ]
 
+# ---------------- PHASE 1 CONTRACT ----------------
+
+ALLOWED_URGENCY_LEVELS = ["low", "medium", "high"]
+
+SENTIMENT_KEYS = ["positive", "negative", "neutral"]
+
+LIST_FIELDS = [
+    "top_pain_points",
+    "top_positive_drivers",
+    "key_themes",
+    "recommended_actions"
+]
+
+REQUIRED_FIELDS = ["sentiment_distribution", "urgency"] + LIST_FIELDS
+
+# Above this many reviews the LLM only sees a clustered sample,
+# so token cost stays fixed regardless of corpus size.
+SAMPLING_THRESHOLD = 1000
+SAMPLE_SIZE = 200
+SAMPLE_CLUSTERS = 20
+
+# ---------------- HEURISTIC LEXICON ----------------
+
+POSITIVE_WORDS = [
+    "good", "great", "excellent", "love", "amazing",
+    "best", "happy", "satisfied"
+]
+
+NEGATIVE_WORDS = [
+    "bad", "poor", "terrible", "hate", "worst",
+    "disappointed", "awful", "horrible"
+]
+
+# Per-review keywords match whole tokens only
+CATEGORY_KEYWORDS = {
+    "delivery": ["package", "packages", "courier", "late"],
+    "product": ["product", "products", "quality", "broken", "size", "material"],
+    "support": ["support", "service", "agent", "agents", "email", "response", "help"],
+    "billing": [
+        "bill", "bills", "billed", "billing", "charge", "charges", "charged",
+        "price", "prices", "payment", "payments"
+    ],
+    "app": ["app", "apps", "login", "bug", "bugs", "update", "updates", "website"]
+}
+
+# Stems also match longer tokens (shipping, refunded, crashes)
+CATEGORY_STEMS = {
+    "delivery": ("deliver", "ship"),
+    "product": ("defect",),
+    "support": (),
+    "billing": ("refund", "invoice"),
+    "app": ("crash",)
+}
+
 # ---------------- CONFIG ----------------
 
 def configure_gemini():
@@ -38,30 +103,72 @@ def configure_gemini():
 def extract_json(text: str):
     """
     Safely extract first JSON object from model output.
+    Text after the matching closing brace is ignored.
     """
-    start = text.find("{")
-    end = text.rfind("}") + 1
-
-    if start == -1 or end == -1:
-        raise json.JSONDecodeError("No JSON object found", text, 0)
+    return parse_json_object(text)
 
-    return json.loads(text[start:end])
 
+def validate_analysis_event(kind, key, value):
+    """
+    Phase-1 schema check for a single streamed field or list item.
+    Raises SchemaViolation on the first invalid value.
+    """
 
-# ---------------- LLM ANALYSIS ----------------
-
-def analyze_reviews(reviews_text, model_name="gemini-2.5-flash", max_retries=1):
+    if key not in REQUIRED_FIELDS:
+        raise SchemaViolation(f"Unexpected field: {key}")
+
+    if kind == "item":
+        if key not in LIST_FIELDS:
+            raise SchemaViolation(f"Field {key} must not be a list")
+        if not isinstance(value, str):
+            raise SchemaViolation(f"Items of {key} must be strings")
+        return
+
+    if key == "sentiment_distribution":
+        if not isinstance(value, dict) or set(value) != set(SENTIMENT_KEYS):
+            raise SchemaViolation(
+                f"sentiment_distribution must have keys {SENTIMENT_KEYS}"
+            )
+        for name in SENTIMENT_KEYS:
+            number = value[name]
+            if isinstance(number, bool) or not isinstance(number, (int, float)):
+                raise SchemaViolation(f"Sentiment {name} must be a number")
+        if abs(sum(value.values()) - 100) > 1:
+            raise SchemaViolation("Sentiment percentages must sum to 100")
+
+    elif key == "urgency":
+        if value not in ALLOWED_URGENCY_LEVELS:
+            raise SchemaViolation(f"Invalid urgency: {value}")
+
+    elif not isinstance(value, list) or not value:
+        raise SchemaViolation(f"{key} must be a non-empty list")
+
+
+def validate_analysis(analysis):
     """
-    Phase-1 reasoning unit.
-    Returns structured JSON or None.
+    Phase-1 schema check for a complete analysis object.
     """
 
-    if not configure_gemini():
-        return None
+    for key in REQUIRED_FIELDS:
+        if key not in analysis:
+            raise SchemaViolation(f"Missing field: {key}")
+        validate_analysis_event("field", key, analysis[key])
+
+    return analysis
 
-    model = genai.GenerativeModel(model_name)
 
-    base_prompt = f"""
+# ---------------- LLM ANALYSIS ----------------
+
+def build_analysis_prompt(reviews_text, sampled=False):
+    sampling_rule = ""
+    if sampled:
+        sampling_rule = """- Reviews are a representative sample grouped into clusters
+- Each cluster header gives its share of ALL reviews
+- Weight sentiment, themes and pain points by cluster share,
+  not by the number of sample reviews shown
+"""
+
+    return f"""
 SYSTEM INSTRUCTION:
 You are a strict JSON generator.
 
@@ -88,54 +195,161 @@ Rules:
 - All lists must contain at least one item
 - urgency must be one of: low, medium, high
 - Do NOT include explanations, markdown, or comments
-
+{sampling_rule}
 Customer reviews:
 {reviews_text}
 """
 
+
+def build_retry_prompt(base_prompt, last_error):
+    return base_prompt + f"""
+
+IMPORTANT:
+Your previous response failed with the following error:
+{last_error}
+
+Return ONLY valid JSON. No explanation.
+"""
+
+
+def analyze_reviews(
+    reviews_text,
+    model_name="gemini-2.5-flash",
+    max_retries=1,
+    sampled=False
+):
+    """
+    Phase-1 reasoning unit.
+    Returns structured JSON or None.
+    """
+
+    if not configure_gemini():
+        return None
+
+    model = genai.GenerativeModel(model_name)
+
+    base_prompt = build_analysis_prompt(reviews_text, sampled)
     prompt = base_prompt
     last_error = None
 
     for attempt in range(max_retries + 1):
         try:
             response = model.generate_content(prompt)
-            return extract_json(response.text)
+            return validate_analysis(extract_json(response.text))
 
         except Exception as e:
             last_error = str(e)
-            prompt = base_prompt + f"""
+            prompt = build_retry_prompt(base_prompt, last_error)
 
-IMPORTANT:
-Your previous response failed with the following error:
-{last_error}
+    st.error("LLM returned invalid JSON after retry.")
+    return None
 
-Return ONLY valid JSON. No explanation.
-"""
+
+def stream_analysis(model, prompt, on_update=None):
+    """
+    Consume a streamed response with an incremental parser.
+    Calls on_update(partial) whenever a field or list item completes.
+    Aborts on the first schema violation.
+    """
+
+    parser = IncrementalJSONParser(validate=validate_analysis_event)
+    response = model.generate_content(prompt, stream=True)
+
+    for chunk in response:
+        events = parser.feed(chunk.text)
+        if events and on_update:
+            on_update(dict(parser.result))
+        if parser.done:
+            break
+
+    return validate_analysis(parser.close())
+
+
+def analyze_reviews_stream(
+    reviews_text,
+    on_update=None,
+    model_name="gemini-2.5-flash",
+    max_retries=1,
+    sampled=False
+):
+    """
+    Streaming Phase-1 reasoning unit.
+    Same contract as analyze_reviews, but partial results are
+    surfaced through on_update while the model is still generating.
+    """
+
+    if not configure_gemini():
+        return None
+
+    model = genai.GenerativeModel(model_name)
+
+    base_prompt = build_analysis_prompt(reviews_text, sampled)
+    prompt = base_prompt
+    last_error = None
+
+    for attempt in range(max_retries + 1):
+        try:
+            return stream_analysis(model, prompt, on_update)
+
+        except Exception as e:
+            last_error = str(e)
+            prompt = build_retry_prompt(base_prompt, last_error)
 
     st.error("LLM returned invalid JSON after retry.")
     return None
 
 
+# ---------------- SAMPLING ----------------
+
+def prepare_llm_input(reviews):
+    """
+    Returns (text, sampled).
+    Large corpora are reduced to a stratified cluster sample locally.
+    Spooled reviews are read through a memory map, never as one string.
+    """
+
+    if isinstance(reviews, ReviewSpool):
+        with reviews.open() as reader:
+            return build_llm_input(reader)
+
+    return build_llm_input([r for r in reviews.split("\n") if r.strip()])
+
+
+def build_llm_input(reviews):
+    if len(reviews) <= SAMPLING_THRESHOLD:
+        return "\n".join(reviews), False
+
+    clusters = representative_sample(
+        reviews,
+        sample_size=SAMPLE_SIZE,
+        n_clusters=SAMPLE_CLUSTERS
+    )
+
+    sections = []
+    for number, cluster in enumerate(clusters, start=1):
+        header = (
+            f"## Cluster {number} "
+            f"({cluster['share']:.1%} of {len(reviews)} reviews, "
+            f"{cluster['size']} reviews)"
+        )
+        sections.append("\n".join([header] + cluster["reviews"]))
+
+    return "\n\n".join(sections), True
+
+
 # ---------------- FALLBACK ----------------
 
-def quick_sentiment_analysis(reviews_text):
+def quick_sentiment_analysis(reviews):
     """
     Deterministic heuristic baseline.
     Model-independent.
     """
 
-    positive_words = [
-        "good", "great", "excellent", "love", "amazing",
-        "best", "happy", "satisfied"
-    ]
-    negative_words = [
-        "bad", "poor", "terrible", "hate", "worst",
-        "disappointed", "awful", "horrible"
-    ]
-
-    text = reviews_text.lower()
-    pos = sum(text.count(w) for w in positive_words)
-    neg = sum(text.count(w) for w in negative_words)
+    pos = neg = 0
+    for review in iter_reviews(reviews):
+        text = review.lower()
+        pos += sum(text.count(w) for w in POSITIVE_WORDS)
+        neg += sum(text.count(w) for w in NEGATIVE_WORDS)
 
     if pos + neg == 0:
         return 34, 33, 33
@@ -147,21 +361,63 @@ def quick_sentiment_analysis(reviews_text):
     return positive, negative, neutral
 
 
+def score_review(review):
+    """
+    Heuristic label and score in [-1, 1] for a single review.
+    """
+
+    tokens = TOKEN_PATTERN.findall(review.lower())
+    pos = sum(token in POSITIVE_WORDS for token in tokens)
+    neg = sum(token in NEGATIVE_WORDS for token in tokens)
+
+    if pos == neg:
+        return "neutral", 0.0
+
+    score = (pos - neg) / (pos + neg)
+    return ("positive" if score > 0 else "negative"), score
+
+
+def categorize_review(review):
+    """
+    Keyword-based issue category for a single review.
+    """
+
+    tokens = TOKEN_PATTERN.findall(review.lower())
+    hits = {
+        category: sum(
+            token in words or token.startswith(CATEGORY_STEMS[category])
+            for token in tokens
+        )
+        for category, words in CATEGORY_KEYWORDS.items()
+    }
+    category = max(hits, key=hits.get)
+
+    return category if hits[category] > 0 else "other"
+
+
 # ---------------- ORCHESTRATION ----------------
 
-def analyze_with_fallback(reviews_text):
+def analyze_with_fallback(reviews, on_update=None):
     """
     Phase-1 orchestrator.
     Always returns contract-valid data.
+    Streams partial results when on_update is given.
     """
 
-    analysis = analyze_reviews(reviews_text)
+    llm_text, sampled = prepare_llm_input(reviews)
+
+    if on_update is not None:
+        analysis = analyze_reviews_stream(
+            llm_text, on_update, sampled=sampled
+        )
+    else:
+        analysis = analyze_reviews(llm_text, sampled=sampled)
 
     if analysis is not None:
         return analysis, "llm"
 
     # Heuristic fallback (contract-safe)
-    positive, negative, neutral = quick_sentiment_analysis(reviews_text)
+    positive, negative, neutral = quick_sentiment_analysis(reviews)
 
     fallback = {
         "sentiment_distribution": {
@@ -178,6 +434,35 @@ def analyze_with_fallback(reviews_text):
 
     return fallback, "heuristic"
 
+
+def log_analysis_run(analysis_data, source, reviews):
+    """
+    Persist the Phase-1 sentiment summary to the time series.
+    Only contract-valid output from analyze_with_fallback is logged.
+    Returns the run id.
+    """
+
+    return insert_sentiment_run({
+        "timestamp": datetime.utcnow().isoformat(),
+        "source": source,
+        "sentiment_distribution": analysis_data["sentiment_distribution"],
+        "urgency": analysis_data["urgency"],
+        "review_count": count_reviews(reviews)
+    })
+
+
+def log_review_results(run_id, reviews):
+    """
+    Persist a heuristic label and category for every review of a run.
+    Scoring is local, so this costs no LLM tokens at any corpus size.
+    """
+
+    insert_review_results(run_id, (
+        (index, review, *score_review(review), categorize_review(review))
+        for index, review in enumerate(iter_reviews(reviews))
+        if review.strip()
+    ))
+
 # ---------------- PHASE 2 DECISION ----------------
 
 def decide_actions(analysis_data, model_name="gemini-2.5-flash"):
@@ -241,12 +526,16 @@ def decide_escalation(level, reason):
     }
 
 def log_decision(category_data, escalation_data):
+    """
+    Log a decision and update system_state in the same transaction.
+    Returns the updated state.
+    """
     decision = {
         "timestamp": datetime.utcnow().isoformat(),
         "issue_category": category_data,
         "escalation": escalation_data
     }
-    insert_decision(decision)
+    return record_decision(decision, {c: 0 for c in ALLOWED_CATEGORIES})
 
 def phase2_process(analysis_data):
     """
@@ -269,33 +558,12 @@ def phase2_process(analysis_data):
         decision["escalation"]["reason"]
     )
 
-    # --- LOAD STATE FROM DB ---
-    issue_counts = get_state(
-        "issue_counts",
-        {c: 0 for c in ALLOWED_CATEGORIES}
-    )
-
-    escalation_active = get_state("escalation_active", False)
-
-    # --- UPDATE STATE ---
-    category = category_data["category"]
-    issue_counts[category] += 1
-
-    if escalation_data["level"] != "none":
-        escalation_active = True
-
-    # --- SAVE STATE TO DB ---
-    set_state("issue_counts", issue_counts)
-    set_state("escalation_active", escalation_active)
-
-    # Log decision (already implemented)
-    log_decision(category_data, escalation_data)
+    # --- LOG DECISION AND UPDATE STATE ---
+    # One transaction, so state and log cannot diverge
+    state_snapshot = log_decision(category_data, escalation_data)
 
     return {
         "category": category_data,
         "escalation": escalation_data,
-        "state_snapshot": {
-            "issue_counts": issue_counts,
-            "escalation_active": escalation_active
-        }
+        "state_snapshot": state_snapshot
     }
\ No newline at end of file
@@ -0,0 +1,259 @@
+import os
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from utils.db import (
+    DECISION_COLUMNS,
+    fetch_decision_page,
+    get_connection,
+    write_checkpoint,
+)
+
+ARCHIVE_DIR = "data/archive/decision_log"
+
+RETENTION_DAYS = 30
+
+# Rows read into memory per compaction step
+COMPACTION_BATCH_ROWS = 50000
+
+
+# ---------------- PARTITIONS ----------------
+
+def partition_dir(day):
+    return os.path.join(ARCHIVE_DIR, f"date={day}")
+
+
+def list_partitions(since=None, until=None):
+    """
+    Archived partition days, optionally pruned to a date range.
+    """
+    if not os.path.isdir(ARCHIVE_DIR):
+        return []
+
+    days = sorted(
+        name.split("=", 1)[1]
+        for name in os.listdir(ARCHIVE_DIR)
+        if name.startswith("date=")
+    )
+
+    if since is not None:
+        days = [d for d in days if d >= since[:10]]
+    if until is not None:
+        days = [d for d in days if d <= until[:10]]
+
+    return days
+
+
+def partition_files(day):
+    """
+    Part files of one partition, ordered by their first id.
+    """
+    directory = partition_dir(day)
+    names = [n for n in os.listdir(directory) if n.endswith(".parquet")]
+    names.sort(key=lambda n: int(n.split("-")[1]))
+    return [os.path.join(directory, n) for n in names]
+
+
+def part_id_range(path):
+    """
+    (first id, last id) of a part file, read from its name.
+    """
+    _, first, last = os.path.basename(path)[:-len(".parquet")].split("-")
+    return int(first), int(last)
+
+
+def write_partition(day, df):
+    """
+    Write one compressed part file per compaction run.
+    The file is renamed into place so readers never see partial writes.
+    """
+    directory = partition_dir(day)
+    os.makedirs(directory, exist_ok=True)
+
+    name = f"part-{df['id'].min()}-{df['id'].max()}.parquet"
+    path = os.path.join(directory, name)
+    tmp_path = path + ".tmp"
+
+    df.to_parquet(tmp_path, index=False, compression="zstd")
+    os.replace(tmp_path, path)
+
+    return path
+
+
+# ---------------- COMPACTION ----------------
+
+def compact_decision_log(retention_days=RETENTION_DAYS, vacuum=True):
+    """
+    Move decision_log rows older than the retention window into
+    date-partitioned Parquet files, COMPACTION_BATCH_ROWS at a time.
+
+    Files and a state checkpoint are written before rows are deleted.
+    A crash in between leaves rows in both places, which the keyset
+    readers skip by id.
+    """
+    cutoff = (
+        datetime.utcnow() - timedelta(days=retention_days)
+    ).isoformat()
+
+    conn = get_connection()
+    moved = 0
+
+    while True:
+        df = pd.read_sql_query(
+            f"""
+            SELECT {", ".join(DECISION_COLUMNS)}
+            FROM decision_log
+            WHERE timestamp < ?
+            ORDER BY id
+            LIMIT ?
+            """,
+            conn,
+            params=(cutoff, COMPACTION_BATCH_ROWS)
+        )
+
+        if df.empty:
+            break
+
+        for day, rows in df.groupby(df["timestamp"].str[:10]):
+            write_partition(day, rows)
+
+        if moved == 0:
+            # Replay starts from the newest checkpoint, so it must cover
+            # every row before those rows leave the live table
+            write_checkpoint()
+
+        conn.execute(
+            "DELETE FROM decision_log WHERE id <= ? AND timestamp < ?",
+            (int(df["id"].max()), cutoff)
+        )
+        conn.commit()
+        moved += len(df)
+
+    if vacuum and moved:
+        conn.execute("VACUUM")
+
+    conn.close()
+    return moved
+
+
+# ---------------- QUERY LAYER ----------------
+
+def filter_decisions(df, since=None, until=None, category=None):
+    if since is not None:
+        df = df[df["timestamp"] >= since]
+    if until is not None:
+        df = df[df["timestamp"] < until]
+    if category is not None:
+        df = df[df["issue_category"] == category]
+    return df
+
+
+def iter_archive_pages(since=None, until=None, category=None, page_size=1000):
+    """
+    Yield archived decisions as lists of dicts, one part file at a time,
+    each file in id order.
+    """
+    for day in list_partitions(since, until):
+        for path in partition_files(day):
+            df = filter_decisions(pd.read_parquet(path), since, until, category)
+            records = df.sort_values("id").to_dict("records")
+
+            for start in range(0, len(records), page_size):
+                yield records[start:start + page_size]
+
+
+def fetch_archive_page(
+    cursor_id=None,
+    limit=100,
+    since=None,
+    until=None,
+    category=None,
+    descending=False,
+    bound_id=None
+):
+    """
+    One keyset page of archived decisions, in id order.
+
+    Timestamps are taken before the insert, so around midnight a
+    later day's partition can hold a lower id. Part files are therefore
+    visited by their id range, not by date, until no remaining file
+    can hold a row of the page. Rows past bound_id are not needed.
+    """
+    paths = [
+        path
+        for day in list_partitions(since, until)
+        for path in partition_files(day)
+    ]
+    # Visit files by the end of their range nearest the page
+    if descending:
+        paths.sort(key=lambda p: part_id_range(p)[1], reverse=True)
+    else:
+        paths.sort(key=lambda p: part_id_range(p)[0])
+
+    def beyond(row_id, bound):
+        return row_id < bound if descending else row_id > bound
+
+    rows = {}
+
+    for path in paths:
+        first, last = part_id_range(path)
+        if cursor_id is not None:
+            if descending and first >= cursor_id:
+                continue
+            if not descending and last <= cursor_id:
+                continue
+
+        bound = bound_id
+        if len(rows) >= limit:
+            bound = sorted(rows, reverse=descending)[limit - 1]
+        if bound is not None and beyond(last if descending else first, bound):
+            break
+
+        df = filter_decisions(pd.read_parquet(path), since, until, category)
+        if cursor_id is not None:
+            df = df[df["id"] < cursor_id] if descending else df[df["id"] > cursor_id]
+        if bound is not None:
+            df = df[df["id"] >= bound] if descending else df[df["id"] <= bound]
+
+        # Keyed by id: a row can sit in two part files after an
+        # interrupted compaction
+        for row in df.to_dict("records"):
+            rows[row["id"]] = row
+
+        if len(rows) > limit:
+            rows = {i: rows[i] for i in sorted(rows, reverse=descending)[:limit]}
+
+    return [rows[i] for i in sorted(rows, reverse=descending)]
+
+
+def fetch_decision_log_page(
+    cursor_id=None,
+    limit=100,
+    since=None,
+    until=None,
+    category=None,
+    descending=False
+):
+    """
+    One keyset page across the live table and the archive.
+    Ids of the two overlap, so both are read and merged by id.
+    """
+    filters = {"since": since, "until": until, "category": category}
+
+    live = fetch_decision_page(cursor_id, limit, descending=descending, **filters)
+
+    # A full live page bounds which archived rows can still make the page
+    bound_id = live[-1]["id"] if len(live) == limit else None
+    archived = fetch_archive_page(
+        cursor_id, limit, descending=descending, bound_id=bound_id, **filters
+    )
+
+    # Rows in both places after an interrupted compaction appear once
+    rows = {row["id"]: row for row in archived + live}
+    return [rows[i] for i in sorted(rows, reverse=descending)[:limit]]
+
+
+if __name__ == "__main__":
+    moved = compact_decision_log()
+    print(f"Archived {moved} decision_log rows")
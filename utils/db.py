@@ -1,9 +1,40 @@
 import sqlite3
 import os
 import json
+import copy
+import threading
+from datetime import datetime, timedelta
 
 DB_PATH = "data/app.db"
 
+# Downsampled rollups kept for the sentiment time series.
+# Bucket key is the run timestamp truncated to the given format.
+ROLLUP_RESOLUTIONS = {
+    "minute": "%Y-%m-%dT%H:%M",
+    "hour": "%Y-%m-%dT%H:00",
+    "day": "%Y-%m-%d"
+}
+
+URGENCY_SCORES = {"low": 1, "medium": 2, "high": 3}
+
+# A state checkpoint is written every this many decision_log rows,
+# so replay never applies more than this many rows.
+CHECKPOINT_INTERVAL = 1000
+
+# Per-review results of runs older than this are deleted
+REVIEW_RESULTS_RETENTION_DAYS = 30
+
+_state_verified = False
+
+DECISION_COLUMNS = [
+    "id",
+    "timestamp",
+    "issue_category",
+    "category_confidence",
+    "escalation_level",
+    "escalation_reason"
+]
+
 def get_connection():
     os.makedirs("data", exist_ok=True)
     return sqlite3.connect(DB_PATH)
@@ -24,6 +55,16 @@ def init_db():
     )
     """)
 
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_decision_log_timestamp
+    ON decision_log (timestamp)
+    """)
+
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_decision_log_category
+    ON decision_log (issue_category, id)
+    """)
+
     # System state table
     cursor.execute("""
     CREATE TABLE IF NOT EXISTS system_state (
@@ -32,13 +73,87 @@ def init_db():
     )
     """)
 
+    # State checkpoints derived from decision_log by replay
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS state_checkpoint (
+        last_log_id INTEGER PRIMARY KEY,
+        timestamp TEXT,
+        state TEXT
+    )
+    """)
+
+    # Per-run sentiment time series (append-only)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS sentiment_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT,
+        source TEXT,
+        positive REAL,
+        negative REAL,
+        neutral REAL,
+        urgency TEXT,
+        review_count INTEGER
+    )
+    """)
+
+    # Per-review results, one row per review of a run
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS review_results (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_id INTEGER,
+        review_index INTEGER,
+        review TEXT,
+        sentiment_label TEXT,
+        sentiment_score REAL,
+        category TEXT
+    )
+    """)
+
+    # Tables created while only review indexes were stored lack the text
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(review_results)")]
+    if "review" not in columns:
+        cursor.execute("ALTER TABLE review_results ADD COLUMN review TEXT")
+
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_review_results_sentiment
+    ON review_results (run_id, sentiment_label, sentiment_score)
+    """)
+
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_review_results_category
+    ON review_results (run_id, category, sentiment_score)
+    """)
+
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_review_results_run
+    ON review_results (run_id, review_index)
+    """)
+
+    # Downsampled sentiment aggregates, maintained on every insert
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS sentiment_rollup (
+        resolution TEXT,
+        bucket TEXT,
+        run_count INTEGER,
+        review_count INTEGER,
+        positive_sum REAL,
+        negative_sum REAL,
+        neutral_sum REAL,
+        urgency_sum INTEGER,
+        PRIMARY KEY (resolution, bucket)
+    )
+    """)
+
     conn.commit()
     conn.close()
 
-def insert_decision(decision):
-    conn = get_connection()
-    cursor = conn.cursor()
+    # init_db runs on every script rerun; recovery only once per process
+    global _state_verified
+    if not _state_verified:
+        verify_state()
+        _state_verified = True
 
+def _insert_decision(cursor, decision):
     cursor.execute("""
         INSERT INTO decision_log (
             timestamp,
@@ -55,31 +170,144 @@ def insert_decision(decision):
         decision["escalation"]["level"],
         decision["escalation"]["reason"]
     ))
+    return cursor.lastrowid
+
 
+def insert_decision(decision):
+    conn = get_connection()
+    log_id = _insert_decision(conn.cursor(), decision)
     conn.commit()
     conn.close()
 
-def get_state(key, default=None):
+    if log_id % CHECKPOINT_INTERVAL == 0:
+        write_checkpoint()
+
+
+def record_decision(decision, default_counts=None):
+    """
+    Log a decision and fold it into system_state in one transaction,
+    so state never runs ahead of (or behind) decision_log.
+    Returns the updated state.
+    """
     conn = get_connection()
     cursor = conn.cursor()
 
+    # Take the write lock before reading, so concurrent sessions
+    # cannot overwrite each other's counts
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        issue_counts = _load_state(cursor, "issue_counts")
+        if issue_counts is _MISSING:
+            issue_counts = dict(default_counts or {})
+        escalation_active = _load_state(cursor, "escalation_active")
+        if escalation_active is _MISSING:
+            escalation_active = False
+
+        category = decision["issue_category"]["category"]
+        issue_counts[category] = issue_counts.get(category, 0) + 1
+        if decision["escalation"]["level"] != "none":
+            escalation_active = True
+
+        _save_state(cursor, "issue_counts", issue_counts)
+        _save_state(cursor, "escalation_active", escalation_active)
+        log_id = _insert_decision(cursor, decision)
+
+        conn.commit()
+    finally:
+        conn.close()
+
+    if log_id % CHECKPOINT_INTERVAL == 0:
+        write_checkpoint()
+
+    return {"issue_counts": issue_counts, "escalation_active": escalation_active}
+
+
+def fetch_decision_page(
+    cursor_id=None,
+    limit=100,
+    since=None,
+    until=None,
+    category=None,
+    descending=False
+):
+    """
+    One keyset-paginated page of decision_log.
+    Pass the last id of the previous page as cursor_id.
+    Timestamps are ISO strings; `until` is exclusive.
+    """
+    query = f"SELECT {', '.join(DECISION_COLUMNS)} FROM decision_log WHERE 1 = 1"
+    params = []
+
+    if cursor_id is not None:
+        query += " AND id < ?" if descending else " AND id > ?"
+        params.append(cursor_id)
+    if since is not None:
+        query += " AND timestamp >= ?"
+        params.append(since)
+    if until is not None:
+        query += " AND timestamp < ?"
+        params.append(until)
+    if category is not None:
+        query += " AND issue_category = ?"
+        params.append(category)
+
+    query += " ORDER BY id DESC" if descending else " ORDER BY id"
+    query += " LIMIT ?"
+    params.append(limit)
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    conn.close()
+
+    return [dict(zip(DECISION_COLUMNS, row)) for row in rows]
+
+
+# ---------------- STATE CACHE ----------------
+
+# Read-through cache for system_state. A long-lived watcher connection
+# reads PRAGMA data_version, which changes whenever any other connection
+# (in this or another process) commits, so the cache is dropped on the
+# first read after any write.
+_MISSING = object()
+_state_cache = {}
+_state_version = None
+_state_lock = threading.Lock()
+_watch_conn = None
+_watch_path = None
+
+
+def _current_data_version():
+    global _watch_conn, _watch_path, _state_version
+
+    if _watch_conn is None or _watch_path != DB_PATH:
+        if _watch_conn is not None:
+            _watch_conn.close()
+        os.makedirs("data", exist_ok=True)
+        # Shared across Streamlit script threads, guarded by _state_lock
+        _watch_conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        _watch_path = DB_PATH
+        # Versions of different connections are not comparable
+        _state_version = None
+
+    return _watch_conn.execute("PRAGMA data_version").fetchone()[0]
+
+
+def _load_state(cursor, key):
     cursor.execute(
         "SELECT value FROM system_state WHERE key = ?",
         (key,)
     )
     row = cursor.fetchone()
-    conn.close()
 
     if row is None:
-        return default
+        return _MISSING
 
     return json.loads(row[0])
 
 
-def set_state(key, value):
-    conn = get_connection()
-    cursor = conn.cursor()
-
+def _save_state(cursor, key, value):
     cursor.execute("""
         INSERT INTO system_state (key, value)
         VALUES (?, ?)
@@ -87,5 +315,416 @@ def set_state(key, value):
         DO UPDATE SET value = excluded.value
     """, (key, json.dumps(value)))
 
+
+def _read_state(key):
+    conn = get_connection()
+    value = _load_state(conn.cursor(), key)
+    conn.close()
+
+    return value
+
+
+def get_state(key, default=None):
+    global _state_version
+
+    with _state_lock:
+        version = _current_data_version()
+        if version != _state_version:
+            _state_cache.clear()
+            _state_version = version
+
+        if key not in _state_cache:
+            _state_cache[key] = _read_state(key)
+
+        value = _state_cache[key]
+
+    if value is _MISSING:
+        return default
+
+    # Callers mutate what they get back (e.g. issue_counts)
+    return copy.deepcopy(value)
+
+
+def set_state(key, value):
+    conn = get_connection()
+    _save_state(conn.cursor(), key, value)
     conn.commit()
-    conn.close()
\ No newline at end of file
+    conn.close()
+
+# ---------------- SENTIMENT TIME SERIES ----------------
+
+def insert_sentiment_run(run):
+    """
+    Append one analysis run and fold it into every rollup resolution
+    in the same transaction.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    sentiment = run["sentiment_distribution"]
+    timestamp = datetime.fromisoformat(run["timestamp"])
+    urgency_score = URGENCY_SCORES.get(run["urgency"], 0)
+
+    cursor.execute("""
+        INSERT INTO sentiment_runs (
+            timestamp,
+            source,
+            positive,
+            negative,
+            neutral,
+            urgency,
+            review_count
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, (
+        run["timestamp"],
+        run["source"],
+        sentiment["positive"],
+        sentiment["negative"],
+        sentiment["neutral"],
+        run["urgency"],
+        run["review_count"]
+    ))
+    run_id = cursor.lastrowid
+
+    for resolution, fmt in ROLLUP_RESOLUTIONS.items():
+        cursor.execute("""
+            INSERT INTO sentiment_rollup (
+                resolution,
+                bucket,
+                run_count,
+                review_count,
+                positive_sum,
+                negative_sum,
+                neutral_sum,
+                urgency_sum
+            )
+            VALUES (?, ?, 1, ?, ?, ?, ?, ?)
+            ON CONFLICT(resolution, bucket)
+            DO UPDATE SET
+                run_count = run_count + 1,
+                review_count = review_count + excluded.review_count,
+                positive_sum = positive_sum + excluded.positive_sum,
+                negative_sum = negative_sum + excluded.negative_sum,
+                neutral_sum = neutral_sum + excluded.neutral_sum,
+                urgency_sum = urgency_sum + excluded.urgency_sum
+        """, (
+            resolution,
+            timestamp.strftime(fmt),
+            run["review_count"],
+            sentiment["positive"],
+            sentiment["negative"],
+            sentiment["neutral"],
+            urgency_score
+        ))
+
+    conn.commit()
+    conn.close()
+
+    return run_id
+
+
+def get_sentiment_trend(resolution="day", since=None):
+    """
+    Read the downsampled sentiment trend.
+    Returns one row per bucket with per-run averages.
+    """
+    if resolution not in ROLLUP_RESOLUTIONS:
+        raise ValueError(f"Invalid resolution: {resolution}")
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    query = """
+        SELECT
+            bucket,
+            run_count,
+            review_count,
+            positive_sum / run_count,
+            negative_sum / run_count,
+            neutral_sum / run_count,
+            CAST(urgency_sum AS REAL) / run_count
+        FROM sentiment_rollup
+        WHERE resolution = ?
+    """
+    params = [resolution]
+
+    if since is not None:
+        query += " AND bucket >= ?"
+        params.append(since.strftime(ROLLUP_RESOLUTIONS[resolution]))
+
+    query += " ORDER BY bucket"
+
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    conn.close()
+
+    return [
+        {
+            "bucket": row[0],
+            "runs": row[1],
+            "reviews": row[2],
+            "positive": row[3],
+            "negative": row[4],
+            "neutral": row[5],
+            "urgency_score": row[6]
+        }
+        for row in rows
+    ]
+
+
+# ---------------- REVIEW RESULTS ----------------
+
+REVIEW_COLUMNS = [
+    "review_index",
+    "review",
+    "sentiment_label",
+    "sentiment_score",
+    "category"
+]
+
+REVIEW_SORT_COLUMNS = ["review_index", "sentiment_score"]
+
+
+def insert_review_results(run_id, rows):
+    """
+    Bulk insert (review_index, review, label, score, category) rows and
+    drop results of runs older than REVIEW_RESULTS_RETENTION_DAYS.
+    """
+    cutoff = (
+        datetime.utcnow() - timedelta(days=REVIEW_RESULTS_RETENTION_DAYS)
+    ).isoformat()
+
+    conn = get_connection()
+    conn.executemany("""
+        INSERT INTO review_results (
+            run_id,
+            review_index,
+            review,
+            sentiment_label,
+            sentiment_score,
+            category
+        )
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, ((run_id, *row) for row in rows))
+    conn.execute("""
+        DELETE FROM review_results
+        WHERE run_id IN (
+            SELECT id FROM sentiment_runs WHERE timestamp < ?
+        )
+    """, (cutoff,))
+    conn.commit()
+    conn.close()
+
+
+def list_review_runs(limit=50):
+    """
+    Most recent runs that still have per-review results, newest first.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT id, timestamp, source, review_count
+        FROM sentiment_runs AS r
+        WHERE EXISTS (
+            SELECT 1 FROM review_results WHERE run_id = r.id
+        )
+        ORDER BY id DESC
+        LIMIT ?
+    """, (limit,))
+    rows = cursor.fetchall()
+    conn.close()
+
+    return [
+        dict(zip(["id", "timestamp", "source", "review_count"], row))
+        for row in rows
+    ]
+
+
+def _review_filter(run_id, labels=None, category=None):
+    where = " WHERE run_id = ?"
+    params = [run_id]
+
+    if labels:
+        where += f" AND sentiment_label IN ({', '.join('?' for _ in labels)})"
+        params.extend(labels)
+    if category is not None:
+        where += " AND category = ?"
+        params.append(category)
+
+    return where, params
+
+
+def count_review_results(run_id, labels=None, category=None):
+    where, params = _review_filter(run_id, labels, category)
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM review_results" + where, params)
+    count = cursor.fetchone()[0]
+    conn.close()
+
+    return count
+
+
+def fetch_review_page(
+    run_id,
+    labels=None,
+    category=None,
+    order_by="review_index",
+    descending=False,
+    limit=50,
+    offset=0
+):
+    """
+    One filtered, sorted page of per-review results for a run.
+    Filtering, sorting and paging all happen in SQLite.
+    """
+    if order_by not in REVIEW_SORT_COLUMNS:
+        raise ValueError(f"Invalid sort column: {order_by}")
+
+    where, params = _review_filter(run_id, labels, category)
+    direction = "DESC" if descending else "ASC"
+
+    query = (
+        f"SELECT {', '.join(REVIEW_COLUMNS)} FROM review_results"
+        + where
+        + f" ORDER BY {order_by} {direction}, review_index"
+        + " LIMIT ? OFFSET ?"
+    )
+    params.extend([limit, offset])
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    conn.close()
+
+    return [dict(zip(REVIEW_COLUMNS, row)) for row in rows]
+
+
+# ---------------- REPLAY ----------------
+
+def load_checkpoint(cursor):
+    """
+    Newest checkpoint as (last_log_id, state).
+    """
+    cursor.execute("""
+        SELECT last_log_id, state
+        FROM state_checkpoint
+        ORDER BY last_log_id DESC
+        LIMIT 1
+    """)
+    row = cursor.fetchone()
+
+    if row is None:
+        return 0, {"issue_counts": {}, "escalation_active": False}
+
+    return row[0], json.loads(row[1])
+
+
+def _replay_state(cursor):
+    last_id, state = load_checkpoint(cursor)
+
+    cursor.execute("""
+        SELECT
+            issue_category,
+            COUNT(*),
+            MAX(escalation_level != 'none'),
+            MAX(id)
+        FROM decision_log
+        WHERE id > ?
+        GROUP BY issue_category
+    """, (last_id,))
+    rows = cursor.fetchall()
+
+    issue_counts = state["issue_counts"]
+    for category, count, escalated, max_id in rows:
+        issue_counts[category] = issue_counts.get(category, 0) + count
+        state["escalation_active"] = state["escalation_active"] or bool(escalated)
+        last_id = max(last_id, max_id)
+
+    return last_id, state
+
+
+def replay_state():
+    """
+    Rebuild issue_counts and escalation_active from decision_log.
+    Starts from the newest checkpoint and folds in only newer rows.
+    Returns (last_log_id, state).
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    # One read transaction, so the checkpoint and the rows after it
+    # come from the same snapshot
+    cursor.execute("BEGIN")
+    try:
+        return _replay_state(cursor)
+    finally:
+        conn.close()
+
+
+def write_checkpoint():
+    """
+    Persist the replayed state tagged with the last applied log id.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        last_id, state = _replay_state(cursor)
+        cursor.execute("""
+            INSERT OR IGNORE INTO state_checkpoint (last_log_id, timestamp, state)
+            VALUES (?, ?, ?)
+        """, (last_id, datetime.utcnow().isoformat(), json.dumps(state)))
+        conn.commit()
+    finally:
+        conn.close()
+
+    return last_id
+
+
+def verify_state(repair=True):
+    """
+    Compare live system_state with the state replayed from the log.
+    The log is the history that must explain state, so on mismatch
+    the live state is overwritten with the replayed one.
+    Returns the list of keys that did not match.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    # Hold the write lock from replay to repair, so no decision can
+    # land in between and be "repaired" away
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        _, replayed = _replay_state(cursor)
+
+        live_counts = _load_state(cursor, "issue_counts")
+        if live_counts is _MISSING:
+            live_counts = {}
+        live_escalation = _load_state(cursor, "escalation_active")
+        if live_escalation is _MISSING:
+            live_escalation = False
+
+        replayed_counts = dict.fromkeys(live_counts, 0)
+        replayed_counts.update(replayed["issue_counts"])
+
+        mismatched = []
+
+        if live_counts != replayed_counts:
+            mismatched.append("issue_counts")
+        if live_escalation != replayed["escalation_active"]:
+            mismatched.append("escalation_active")
+
+        if repair and mismatched:
+            _save_state(cursor, "issue_counts", replayed_counts)
+            _save_state(cursor, "escalation_active", replayed["escalation_active"])
+
+        conn.commit()
+    finally:
+        conn.close()
+
+    return mismatched
@@ -1,12 +1,23 @@
 import pandas as pd
+import pyarrow as pa
+from openpyxl import Workbook
+import pyarrow.parquet as pq
 from datetime import datetime
+import csv
 import io
 import json
+import uuid
+
+from utils.archive import iter_archive_pages
+from utils.db import DECISION_COLUMNS, fetch_decision_page
+from utils.spool import count_reviews, iter_reviews
+
+AUDIT_EXPORT_FORMATS = ["csv", "jsonl", "parquet"]
 
 
 # ---------------- CSV EXPORT ----------------
 
-def export_to_csv(analysis_data, reviews_text, phase2_data=None):
+def export_to_csv(analysis_data, reviews, phase2_data=None):
     """
     Export structured analysis data to CSV.
     CSV is data-first, not narrative.
@@ -22,7 +33,7 @@ def export_to_csv(analysis_data, reviews_text, phase2_data=None):
         "top_positive_drivers": "; ".join(analysis_data["top_positive_drivers"]),
         "key_themes": "; ".join(analysis_data["key_themes"]),
         "recommended_actions": "; ".join(analysis_data["recommended_actions"]),
-        "num_reviews": len(reviews_text.split("\n"))
+        "num_reviews": count_reviews(reviews)
     }
 
     if phase2_data:
@@ -40,85 +51,106 @@ def export_to_csv(analysis_data, reviews_text, phase2_data=None):
 
 # ---------------- EXCEL EXPORT ----------------
 
-def export_to_excel(analysis_data, reviews_text, phase2_data=None):
+def append_sheet(workbook, title, header, rows):
+    sheet = workbook.create_sheet(title)
+    sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+
+
+def export_to_excel(analysis_data, reviews, phase2_data=None):
     """
     Export analysis to Excel with clean, structured sheets.
+    The workbook is write-only, so reviews are streamed row by row.
     """
 
-    output = io.BytesIO()
+    workbook = Workbook(write_only=True)
+
+    # Sheet 1: Summary
+    append_sheet(workbook, "Summary", ["Metric", "Value"], [
+        ["Analysis Date", datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
+        ["Total Reviews", count_reviews(reviews)],
+        ["Positive %", analysis_data["sentiment_distribution"]["positive"]],
+        ["Negative %", analysis_data["sentiment_distribution"]["negative"]],
+        ["Neutral %", analysis_data["sentiment_distribution"]["neutral"]],
+        ["Urgency", analysis_data["urgency"]]
+    ])
+
+    # Sheet 2: Insights
+    append_sheet(
+        workbook,
+        "Insights",
+        ["Top Pain Points", "Top Positive Drivers", "Key Themes"],
+        [[
+            "; ".join(analysis_data["top_pain_points"]),
+            "; ".join(analysis_data["top_positive_drivers"]),
+            "; ".join(analysis_data["key_themes"])
+        ]]
+    )
+
+    # Sheet 3: Recommendations
+    append_sheet(
+        workbook,
+        "Recommendations",
+        ["Recommended Actions"],
+        ([action] for action in analysis_data["recommended_actions"])
+    )
+
+    # Sheet 4: Raw Reviews
+    append_sheet(
+        workbook,
+        "Reviews",
+        ["Review"],
+        ([review] for review in iter_reviews(reviews) if review.strip())
+    )
 
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-
-        # Sheet 1: Summary
-        summary_df = pd.DataFrame({
-            "Metric": [
-                "Analysis Date",
-                "Total Reviews",
-                "Positive %",
-                "Negative %",
-                "Neutral %",
-                "Urgency"
+    if phase2_data:
+        append_sheet(
+            workbook,
+            "Pain Points",
+            ["Top Pain Points"],
+            ([point] for point in analysis_data["top_pain_points"])
+        )
+
+        append_sheet(
+            workbook,
+            "Positive Drivers",
+            ["Top Positive Drivers"],
+            ([driver] for driver in analysis_data["top_positive_drivers"])
+        )
+
+        append_sheet(
+            workbook,
+            "Key Themes",
+            ["Key Themes"],
+            ([theme] for theme in analysis_data["key_themes"])
+        )
+
+        append_sheet(
+            workbook,
+            "Decision",
+            [
+                "Issue Category",
+                "Category Confidence",
+                "Escalation Level",
+                "Escalation Reason"
             ],
-            "Value": [
-                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                len(reviews_text.split("\n")),
-                analysis_data["sentiment_distribution"]["positive"],
-                analysis_data["sentiment_distribution"]["negative"],
-                analysis_data["sentiment_distribution"]["neutral"],
-                analysis_data["urgency"]
-            ]
-        })
-        summary_df.to_excel(writer, sheet_name="Summary", index=False)
-
-        # Sheet 2: Insights
-        insights_df = pd.DataFrame({
-            "Top Pain Points": ["; ".join(analysis_data["top_pain_points"])],
-            "Top Positive Drivers": ["; ".join(analysis_data["top_positive_drivers"])],
-            "Key Themes": ["; ".join(analysis_data["key_themes"])]
-        })
-        insights_df.to_excel(writer, sheet_name="Insights", index=False)
-
-        # Sheet 3: Recommendations
-        actions_df = pd.DataFrame({
-            "Recommended Actions": analysis_data["recommended_actions"]
-        })
-        actions_df.to_excel(writer, sheet_name="Recommendations", index=False)
-
-        # Sheet 4: Raw Reviews
-        reviews_df = pd.DataFrame({
-            "Review": reviews_text.split("\n")
-        })
-        reviews_df.to_excel(writer, sheet_name="Reviews", index=False)
-
-        if phase2_data:
-            pd.DataFrame(
-                {"Top Pain Points": analysis_data["top_pain_points"]}
-            ).to_excel(writer, sheet_name="Pain Points", index=False)
-
-            pd.DataFrame(
-                {"Top Positive Drivers": analysis_data["top_positive_drivers"]}
-            ).to_excel(writer, sheet_name="Positive Drivers", index=False)
-
-            pd.DataFrame(
-                {"Key Themes": analysis_data["key_themes"]}
-            ).to_excel(writer, sheet_name="Key Themes", index=False)
-
-            decision_df = pd.DataFrame({
-                "Issue Category": [phase2_data["category"]["category"]],
-                "Category Confidence": [phase2_data["category"]["confidence"]],
-                "Escalation Level": [phase2_data["escalation"]["level"]],
-                "Escalation Reason": [phase2_data["escalation"]["reason"]],
-            })
-
-            decision_df.to_excel(writer, sheet_name="Decision", index=False)
-
-    output.seek(0)
+            [[
+                phase2_data["category"]["category"],
+                phase2_data["category"]["confidence"],
+                phase2_data["escalation"]["level"],
+                phase2_data["escalation"]["reason"]
+            ]]
+        )
+
+    output = io.BytesIO()
+    workbook.save(output)
     return output.getvalue()
 
 
 # ---------------- MARKDOWN REPORT ----------------
 
-def create_markdown_report(analysis_data, reviews_text, phase2_data=None):
+def create_markdown_report(analysis_data, reviews, phase2_data=None):
     """
     Human-readable report derived entirely from structured data.
     """
@@ -137,7 +169,7 @@ def create_markdown_report(analysis_data, reviews_text, phase2_data=None):
 - **Negative:** {sentiment["negative"]}%
 - **Neutral:** {sentiment["neutral"]}%
 - **Urgency Level:** {analysis_data["urgency"].capitalize()}
-- **Total Reviews:** {len(reviews_text.split("\\n"))}
+- **Total Reviews:** {count_reviews(reviews)}
 
 ---
 
@@ -187,19 +219,118 @@ def create_markdown_report(analysis_data, reviews_text, phase2_data=None):
 
 # ---------------- JSON EXPORT ----------------
 
-def export_to_json(analysis_data, reviews_text, phase2_data=None):
+def export_to_json(analysis_data, reviews, phase2_data=None):
     """
     Machine-readable export.
     This mirrors the Phase-1 contract exactly.
     """
 
+    # Reviews are spliced in one at a time instead of building a list
+    placeholder = f"__reviews_{uuid.uuid4().hex}__"
+
     payload = {
         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "analysis": analysis_data,
-        "reviews": reviews_text.split("\n")
+        "reviews": placeholder
     }
 
     if phase2_data:
         payload["decision"] = phase2_data
 
-    return json.dumps(payload, indent=2)
\ No newline at end of file
+    head, tail = json.dumps(payload, indent=2).split(json.dumps(placeholder))
+
+    buffer = io.StringIO()
+    buffer.write(head + "[")
+
+    written = 0
+    for review in iter_reviews(reviews):
+        if not review.strip():
+            continue
+        buffer.write(("," if written else "") + "\n    " + json.dumps(review))
+        written += 1
+
+    buffer.write(("\n  ]" if written else "]") + tail)
+    return buffer.getvalue()
+
+
+# ---------------- AUDIT LOG EXPORT ----------------
+
+def iter_decision_log(since=None, until=None, category=None, page_size=1000):
+    """
+    Yield the full audit log as pages of dicts.
+    Archived partitions come first, then the live table is read
+    with keyset pagination. Only one page of rows is held in memory,
+    plus the set of archived ids.
+    """
+
+    # Ids are not ordered across partitions (timestamps are taken before
+    # the insert), and the live table can hold ids below archived ones,
+    # so copies left by an interrupted compaction are skipped by id
+    archived = set()
+
+    for page in iter_archive_pages(since, until, category, page_size):
+        page = [row for row in page if row["id"] not in archived]
+        archived.update(row["id"] for row in page)
+        if page:
+            yield page
+
+    last_id = 0
+
+    while True:
+        page = fetch_decision_page(
+            cursor_id=last_id,
+            limit=page_size,
+            since=since,
+            until=until,
+            category=category
+        )
+        if not page:
+            return
+
+        last_id = page[-1]["id"]
+        page = [row for row in page if row["id"] not in archived]
+        if page:
+            yield page
+
+
+def export_decision_log(path, fmt="csv", **filters):
+    """
+    Stream the audit log to a file without materializing it.
+    Returns the number of rows written.
+    """
+
+    if fmt not in AUDIT_EXPORT_FORMATS:
+        raise ValueError(f"Invalid export format: {fmt}")
+
+    rows = 0
+
+    if fmt == "parquet":
+        schema = pa.schema([
+            ("id", pa.int64()),
+            ("timestamp", pa.string()),
+            ("issue_category", pa.string()),
+            ("category_confidence", pa.float64()),
+            ("escalation_level", pa.string()),
+            ("escalation_reason", pa.string())
+        ])
+        with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+            for page in iter_decision_log(**filters):
+                writer.write_table(pa.Table.from_pylist(page, schema=schema))
+                rows += len(page)
+            if rows == 0:
+                writer.write_table(schema.empty_table())
+        return rows
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            writer = csv.DictWriter(f, fieldnames=DECISION_COLUMNS)
+            writer.writeheader()
+
+        for page in iter_decision_log(**filters):
+            if fmt == "csv":
+                writer.writerows(page)
+            else:
+                f.writelines(json.dumps(row) + "\n" for row in page)
+            rows += len(page)
+
+    return rows
@@ -0,0 +1,229 @@
+import json
+
+
+class SchemaViolation(ValueError):
+    """
+    Raised as soon as a streamed field breaks the expected contract.
+    """
+
+
+class IncrementalJSONParser:
+    """
+    Incremental parser for a single top-level JSON object.
+
+    Text is fed chunk by chunk. Every top-level member is emitted the
+    moment its value is complete, and items of top-level arrays are
+    emitted as soon as each item is complete. Anything after the
+    matching `}` is ignored.
+
+    Prose before the object may contain braces: when the text at a `{`
+    turns out not to be a valid object, parsing starts again at the
+    next `{`. Keys are checked character by character, so prose fails
+    at its first word. Once a candidate has emitted an event it is the
+    object, and any later error is raised instead of skipped.
+
+    Events are tuples:
+    - ("field", key, value)
+    - ("item", key, value)
+    """
+
+    def __init__(self, validate=None):
+        self.validate = validate
+        self.done = False
+
+        self._buf = ""
+        self._restart(0)
+
+    def feed(self, chunk):
+        """
+        Consume a chunk of text and return the list of completed events.
+        """
+
+        if self.done or not chunk:
+            return []
+
+        self._buf += chunk
+        return self._scan()
+
+    def close(self):
+        """
+        Finish parsing and return the full object.
+        """
+
+        # An unclosed candidate may be prose; try every later `{`
+        while not self.done and self._start is not None:
+            if self._emitted:
+                self._fail("Unterminated object", len(self._buf))
+            self._restart(self._start + 1)
+            self._scan()
+
+        if not self.done:
+            raise json.JSONDecodeError(
+                "No complete JSON object found", self._buf, len(self._buf)
+            )
+        return self.result
+
+    # ---------------- INTERNALS ----------------
+
+    def _restart(self, pos):
+        self.result = {}
+        self._pos = pos
+        self._start = None
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+
+        self._member_start = None
+        self._value_start = None
+        self._array_start = None
+        self._item_start = None
+        self._key = None
+        # "start": expect a key or `}`; "string": in the key; "closed": expect `:`
+        self._key_state = "start"
+        self._emitted = False
+
+    def _scan(self):
+        events = []
+
+        while self._pos < len(self._buf) and not self.done:
+            try:
+                event = self._step()
+            except json.JSONDecodeError:
+                # Events already reached the caller; this is the object
+                if self._emitted:
+                    raise
+                # Not a valid object at this `{`; retry from the next one
+                self._restart(self._start + 1)
+                continue
+
+            if event is not None:
+                events.extend(event)
+
+        return events
+
+    def _step(self):
+        i = self._pos
+        ch = self._buf[i]
+        self._pos += 1
+
+        if self._start is None:
+            if ch == "{":
+                self._start = i
+                self._stack.append("{")
+                self._member_start = i + 1
+            return None
+
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif ch == "\\":
+                self._escape = True
+            elif ch == '"':
+                self._in_string = False
+                if self._key_state == "string":
+                    self._key_state = "closed"
+            return None
+
+        if self._stack == ["{"] and self._key is None and not ch.isspace():
+            self._check_key(ch, i)
+
+        events = []
+
+        if ch == '"':
+            self._in_string = True
+        elif ch in "{[":
+            if ch == "[" and self._stack == ["{"]:
+                self._array_start = i + 1
+                self._item_start = i + 1
+            self._stack.append(ch)
+        elif ch == ":" and self._stack == ["{"]:
+            if self._key is not None:
+                self._fail("Unexpected ':'", i)
+            self._key = self._load(self._member_start, i)
+            if not isinstance(self._key, str):
+                self._fail("Object keys must be strings", i)
+            self._value_start = i + 1
+        elif ch == "," and self._stack == ["{"]:
+            events.append(self._complete_member(i))
+            self._member_start = i + 1
+        elif ch == "," and self._stack == ["{", "["]:
+            events.append(self._complete_item(i))
+            self._item_start = i + 1
+        elif ch in "}]":
+            expected = "{" if ch == "}" else "["
+            if self._stack[-1] != expected:
+                self._fail(f"Unexpected '{ch}'", i)
+
+            if self._stack == ["{", "["]:
+                if self._buf[self._item_start:i].strip():
+                    events.append(self._complete_item(i))
+                elif self._item_start != self._array_start:
+                    self._fail("Trailing comma in array", i)
+                self._item_start = None
+
+            if self._stack == ["{"]:
+                # Closing the top-level object: `{}` or a final member;
+                # a key-side `}` was already checked by _check_key
+                if self._key is not None:
+                    events.append(self._complete_member(i))
+                self.done = True
+
+            self._stack.pop()
+
+        return events
+
+    def _check_key(self, ch, pos):
+        """
+        Validate a non-space character between `{`/`,` and `:`.
+        """
+        if self._key_state == "start":
+            if ch == '"':
+                self._key_state = "string"
+            elif ch == "}":
+                if self._member_start != self._start + 1:
+                    self._fail("Trailing comma in object", pos)
+            else:
+                self._fail("Expected property name", pos)
+        elif ch != ":":
+            self._fail("Expected ':' after object key", pos)
+
+    def _fail(self, message, pos):
+        raise json.JSONDecodeError(message, self._buf, pos)
+
+    def _load(self, start, end):
+        text = self._buf[start:end].strip()
+        return json.loads(text)
+
+    def _complete_member(self, end):
+        key = self._key
+        if key is None:
+            self._fail("Expected ':' after object key", end)
+
+        value = self._load(self._value_start, end)
+        if self.validate:
+            self.validate("field", key, value)
+
+        self.result[key] = value
+        self._key = None
+        self._key_state = "start"
+        self._emitted = True
+        return ("field", key, value)
+
+    def _complete_item(self, end):
+        value = self._load(self._item_start, end)
+        if self.validate:
+            self.validate("item", self._key, value)
+
+        self.result.setdefault(self._key, []).append(value)
+        self._emitted = True
+        return ("item", self._key, value)
+
+
+def parse_json_object(text, validate=None):
+    """
+    Parse the first complete JSON object in `text` in one call.
+    """
+
+    parser = IncrementalJSONParser(validate=validate)
+    parser.feed(text)
+    return parser.close()
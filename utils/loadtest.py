@@ -0,0 +1,261 @@
+"""
+Concurrent-session load test for the dashboard pipeline.
+
+Each simulated analyst session runs analyze_with_fallback,
+log_analysis_run, log_review_results and phase2_process, the same
+calls the dashboard makes, against a local fake LLM with configurable
+latency and a throwaway SQLite database.
+
+    python -m utils.loadtest --sessions 20 --runs 5 --latency 0.5 --seed 1
+    python -m utils.loadtest --sessions 20 --stream
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import analyzer, db
+
+SAMPLE_REVIEWS = [
+    "Great product, very satisfied!",
+    "Shipping was too slow.",
+    "Support never answered my email.",
+    "The app crashes on login.",
+    "I was billed twice this month.",
+    "Excellent customer service!"
+]
+
+
+# ---------------- FAKE LLM ----------------
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """
+    Stand-in for genai.GenerativeModel.
+    Output and latency are derived from the prompt and the seed, so
+    the same seed always produces the same answers.
+    """
+
+    latency = 0.2
+    jitter = 0.1
+    seed = 0
+
+    def __init__(self, model_name=None):
+        self.model_name = model_name
+
+    def generate_content(self, prompt, stream=False):
+        rng = random.Random(zlib.crc32(prompt.encode("utf-8")) ^ self.seed)
+        time.sleep(max(0.0, rng.gauss(self.latency, self.jitter)))
+
+        if "decision-making system" in prompt:
+            text = json.dumps(self.decision(rng))
+        else:
+            text = json.dumps(self.analysis(rng))
+
+        if not stream:
+            return FakeResponse(text)
+
+        size = max(1, len(text) // 8)
+        return [FakeResponse(text[i:i + size]) for i in range(0, len(text), size)]
+
+    def analysis(self, rng):
+        positive = rng.randint(0, 100)
+        negative = rng.randint(0, 100 - positive)
+        return {
+            "sentiment_distribution": {
+                "positive": positive,
+                "negative": negative,
+                "neutral": 100 - positive - negative
+            },
+            "top_pain_points": ["Slow shipping"],
+            "top_positive_drivers": ["Helpful support"],
+            "key_themes": ["Delivery"],
+            "urgency": rng.choice(analyzer.ALLOWED_URGENCY_LEVELS),
+            "recommended_actions": ["Review courier SLAs"]
+        }
+
+    def decision(self, rng):
+        return {
+            "issue_category": {
+                "category": rng.choice(analyzer.ALLOWED_CATEGORIES),
+                "confidence": round(rng.random(), 2)
+            },
+            "escalation": {
+                "level": rng.choice(analyzer.ALLOWED_ESCALATION_LEVELS),
+                "reason": "load test"
+            }
+        }
+
+
+def install_fake_llm(latency, jitter, seed):
+    """
+    Route analyzer's LLM calls to FakeModel.
+    Returns a callable that puts the real client back.
+    """
+    FakeModel.latency = latency
+    FakeModel.jitter = jitter
+    FakeModel.seed = seed
+
+    original_model = analyzer.genai.GenerativeModel
+    original_configure = analyzer.configure_gemini
+
+    def restore():
+        analyzer.genai.GenerativeModel = original_model
+        analyzer.configure_gemini = original_configure
+
+    analyzer.genai.GenerativeModel = FakeModel
+    analyzer.configure_gemini = lambda: True
+    return restore
+
+
+# ---------------- SESSIONS ----------------
+
+def run_session(session_id, runs, seed, stats, stream=False):
+    rng = random.Random(seed * 100003 + session_id)
+    # Streaming mode parses partial output the way the dashboard does
+    on_update = (lambda partial: None) if stream else None
+
+    for _ in range(runs):
+        reviews = "\n".join(
+            rng.choice(SAMPLE_REVIEWS) for _ in range(rng.randint(5, 50))
+        )
+
+        start = time.perf_counter()
+        try:
+            analysis, source = analyzer.analyze_with_fallback(reviews, on_update)
+            run_id = analyzer.log_analysis_run(analysis, source, reviews)
+            analyzer.log_review_results(run_id, reviews)
+            analyzer.phase2_process(analysis)
+        except sqlite3.OperationalError as e:
+            with stats["lock"]:
+                if "locked" in str(e) or "busy" in str(e):
+                    stats["lock_errors"] += 1
+                else:
+                    stats["other_errors"] += 1
+            continue
+        except Exception:
+            with stats["lock"]:
+                stats["other_errors"] += 1
+            continue
+
+        with stats["lock"]:
+            stats["latencies"].append(time.perf_counter() - start)
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 4)
+
+
+def count_logged_decisions():
+    conn = db.get_connection()
+    count = conn.execute("SELECT COUNT(*) FROM decision_log").fetchone()[0]
+    conn.close()
+    return count
+
+
+def run_load_test(
+    sessions=10,
+    runs=5,
+    latency=0.2,
+    jitter=0.1,
+    seed=0,
+    db_path=None,
+    stream=False
+):
+    """
+    Run the load test and return a report dict.
+    Lost updates are decisions present in decision_log but missing
+    from the issue_counts total.
+    The real database path and LLM client are restored afterwards.
+    """
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(), "loadtest.db")
+
+    stats = {
+        "lock": threading.Lock(),
+        "latencies": [],
+        "lock_errors": 0,
+        "other_errors": 0
+    }
+
+    original_db_path = db.DB_PATH
+    restore_llm = install_fake_llm(latency, jitter, seed)
+    try:
+        db.DB_PATH = db_path
+        db.init_db()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=sessions) as pool:
+            for session_id in range(sessions):
+                pool.submit(run_session, session_id, runs, seed, stats, stream)
+        elapsed = time.perf_counter() - start
+
+        logged = count_logged_decisions()
+        counted = sum(db.get_state("issue_counts", {}).values())
+    finally:
+        db.DB_PATH = original_db_path
+        restore_llm()
+
+    latencies = stats["latencies"]
+
+    return {
+        "sessions": sessions,
+        "runs_per_session": runs,
+        "seed": seed,
+        "stream": stream,
+        "llm_latency": latency,
+        "completed": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(len(latencies) / elapsed, 3),
+        "latency_p50_s": percentile(latencies, 50),
+        "latency_p90_s": percentile(latencies, 90),
+        "latency_p99_s": percentile(latencies, 99),
+        "lock_errors": stats["lock_errors"],
+        "other_errors": stats["other_errors"],
+        "logged_decisions": logged,
+        "issue_count_total": counted,
+        "lost_updates": logged - counted,
+        "db_path": db_path
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db-path", default=None)
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="stream LLM output through on_update, like the dashboard"
+    )
+    args = parser.parse_args()
+
+    report = run_load_test(
+        sessions=args.sessions,
+        runs=args.runs,
+        latency=args.latency,
+        jitter=args.jitter,
+        seed=args.seed,
+        db_path=args.db_path,
+        stream=args.stream
+    )
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,166 @@
+import re
+import zlib
+
+import numpy as np
+
+N_FEATURES = 2 ** 12
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+# ---------------- HASHED TF-IDF ----------------
+
+def hash_token(token):
+    # crc32 is stable across processes, unlike hash()
+    return zlib.crc32(token.encode("utf-8")) % N_FEATURES
+
+
+def build_term_matrix(reviews):
+    """
+    Sparse (CSR-style) hashed term counts.
+    Returns indptr, indices and counts arrays.
+    """
+    indptr = [0]
+    indices = []
+    counts = []
+
+    for review in reviews:
+        buckets = {}
+        for token in TOKEN_PATTERN.findall(review.lower()):
+            bucket = hash_token(token)
+            buckets[bucket] = buckets.get(bucket, 0) + 1
+
+        indices.extend(buckets.keys())
+        counts.extend(buckets.values())
+        indptr.append(len(indices))
+
+    return (
+        np.asarray(indptr, dtype=np.int64),
+        np.asarray(indices, dtype=np.int64),
+        np.asarray(counts, dtype=np.float32)
+    )
+
+
+class HashedTfidf:
+    """
+    TF-IDF over hashed tokens. Rows are densified on demand so a
+    large corpus never needs a full dense matrix in memory.
+    """
+
+    def __init__(self, reviews):
+        self.indptr, self.indices, self.counts = build_term_matrix(reviews)
+        self.n_docs = len(reviews)
+
+        doc_freq = np.bincount(self.indices, minlength=N_FEATURES)
+        self.idf = (
+            np.log((1 + self.n_docs) / (1 + doc_freq)) + 1
+        ).astype(np.float32)
+
+    def rows(self, doc_ids):
+        """
+        Dense, L2-normalized TF-IDF rows for the given documents.
+        """
+        matrix = np.zeros((len(doc_ids), N_FEATURES), dtype=np.float32)
+
+        for row, doc in enumerate(doc_ids):
+            start, end = self.indptr[doc], self.indptr[doc + 1]
+            cols = self.indices[start:end]
+            matrix[row, cols] = np.log1p(self.counts[start:end]) * self.idf[cols]
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return matrix / norms
+
+
+# ---------------- MINI-BATCH K-MEANS ----------------
+
+def minibatch_kmeans(vectors, n_clusters, batch_size=1024, n_iter=50, seed=0):
+    """
+    Mini-batch k-means (Sculley, 2010) with per-centroid learning rates.
+    Returns the centroid matrix.
+    """
+    rng = np.random.default_rng(seed)
+    n_docs = vectors.n_docs
+
+    init_ids = rng.choice(n_docs, size=n_clusters, replace=False)
+    centroids = vectors.rows(init_ids)
+    seen = np.zeros(n_clusters, dtype=np.int64)
+
+    for _ in range(n_iter):
+        batch_ids = rng.choice(n_docs, size=min(batch_size, n_docs), replace=False)
+        batch = vectors.rows(batch_ids)
+        labels = np.argmax(batch @ centroids.T, axis=1)
+
+        for point, label in zip(batch, labels):
+            seen[label] += 1
+            rate = 1.0 / seen[label]
+            centroids[label] = (1 - rate) * centroids[label] + rate * point
+
+    return centroids
+
+
+def assign_clusters(vectors, centroids, chunk_size=4096):
+    """
+    Label every document and score its similarity to its centroid.
+    """
+    labels = np.empty(vectors.n_docs, dtype=np.int64)
+    scores = np.empty(vectors.n_docs, dtype=np.float32)
+
+    for start in range(0, vectors.n_docs, chunk_size):
+        ids = np.arange(start, min(start + chunk_size, vectors.n_docs))
+        similarity = vectors.rows(ids) @ centroids.T
+        labels[ids] = np.argmax(similarity, axis=1)
+        scores[ids] = similarity[np.arange(len(ids)), labels[ids]]
+
+    return labels, scores
+
+
+# ---------------- STRATIFIED SAMPLE ----------------
+
+def allocate_sample(sizes, sample_size):
+    """
+    Split the sample budget proportionally to cluster size,
+    with at least one review from every non-empty cluster.
+    """
+    total = sizes.sum()
+    quota = np.floor(sizes / total * sample_size).astype(np.int64)
+    quota[(sizes > 0) & (quota == 0)] = 1
+    return np.minimum(quota, sizes)
+
+
+def representative_sample(reviews, sample_size=200, n_clusters=20, seed=0):
+    """
+    Cluster reviews locally and return the reviews closest to each
+    centroid, together with the cluster's share of the full corpus.
+
+    Returns a list of {"size", "share", "reviews"} dicts, largest first.
+    """
+    n_clusters = min(n_clusters, len(reviews))
+
+    vectors = HashedTfidf(reviews)
+    centroids = minibatch_kmeans(vectors, n_clusters, seed=seed)
+    labels, scores = assign_clusters(vectors, centroids)
+
+    sizes = np.bincount(labels, minlength=n_clusters)
+    quota = allocate_sample(sizes, sample_size)
+
+    clusters = []
+    for cluster in np.argsort(-sizes):
+        if sizes[cluster] == 0:
+            continue
+
+        members = np.flatnonzero(labels == cluster)
+        picked = []
+        for i in members[np.argsort(-scores[members])]:
+            if len(picked) == quota[cluster]:
+                break
+            if reviews[i] not in picked:
+                picked.append(reviews[i])
+
+        clusters.append({
+            "size": int(sizes[cluster]),
+            "share": float(sizes[cluster] / len(reviews)),
+            "reviews": picked
+        })
+
+    return clusters
@@ -0,0 +1,174 @@
+import mmap
+import os
+import time
+
+import numpy as np
+
+SPOOL_DIR = "data/spool"
+
+# Spool files untouched for this long belong to abandoned sessions
+SPOOL_TTL_SECONDS = 6 * 60 * 60
+
+
+# ---------------- SPOOL HANDLE ----------------
+
+class ReviewSpool:
+    """
+    Small, session-safe handle to reviews spooled on disk.
+
+    Reviews are stored one per line in `<path>`, with their byte
+    offsets in `<path>.idx`. Both are memory-mapped only while read,
+    so session state never holds the review text itself.
+    """
+
+    def __init__(self, path, count):
+        self.path = path
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        with self.open() as reader:
+            yield from reader
+
+    def open(self):
+        self.touch()
+        return SpoolReader(self.path)
+
+    def exists(self):
+        """
+        False once cleanup_spool has removed an idle session's files.
+        """
+        return os.path.exists(self.path) and os.path.exists(self.path + ".idx")
+
+    def touch(self):
+        """
+        Mark the session as active so cleanup_spool keeps the file.
+        """
+        os.utime(self.path)
+
+    def delete(self):
+        for path in (self.path, self.path + ".idx"):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class SpoolReader:
+    """
+    Random-access view over a spool file.
+    Supports len(), iteration and indexing, like a list of strings.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._offsets = np.fromfile(path + ".idx", dtype=np.int64)
+
+        # mmap cannot map an empty file
+        size = os.fstat(self._file.fileno()).st_size
+        self._data = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if size else b""
+        )
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        start, end = self._offsets[index], self._offsets[index + 1]
+        # Drop the trailing newline
+        return self._data[start:end - 1].decode("utf-8")
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+
+# ---------------- SPOOLING ----------------
+
+def spool_reviews(session_id, reviews):
+    """
+    Write an iterable of reviews to the session's spool file.
+    Blank reviews are skipped. Replaces any earlier spool of the session.
+    """
+    os.makedirs(SPOOL_DIR, exist_ok=True)
+    path = os.path.join(SPOOL_DIR, f"{session_id}.txt")
+    tmp_path = path + ".tmp"
+
+    offsets = [0]
+    with open(tmp_path, "wb") as f:
+        for review in reviews:
+            review = " ".join(str(review).split())
+            if not review:
+                continue
+            line = (review + "\n").encode("utf-8")
+            f.write(line)
+            offsets.append(offsets[-1] + len(line))
+
+    np.asarray(offsets, dtype=np.int64).tofile(path + ".idx")
+    os.replace(tmp_path, path)
+
+    return ReviewSpool(path, len(offsets) - 1)
+
+
+def cleanup_spool(max_age=SPOOL_TTL_SECONDS):
+    """
+    Delete spool files of sessions inactive for longer than max_age.
+    """
+    if not os.path.isdir(SPOOL_DIR):
+        return 0
+
+    cutoff = time.time() - max_age
+    removed = 0
+
+    for name in os.listdir(SPOOL_DIR):
+        path = os.path.join(SPOOL_DIR, name)
+        data_path = path[:-len(".idx")] if name.endswith(".idx") else path
+        try:
+            if os.path.getmtime(data_path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except FileNotFoundError:
+            # Data file already gone; an orphaned index can go too
+            if name.endswith(".idx"):
+                os.remove(path)
+                removed += 1
+
+    return removed
+
+
+# ---------------- REVIEW ACCESS ----------------
+
+def iter_reviews(reviews):
+    """
+    Iterate reviews from newline-separated text or a ReviewSpool.
+    """
+    if isinstance(reviews, ReviewSpool):
+        return iter(reviews)
+    return iter(reviews.split("\n"))
+
+
+def count_reviews(reviews):
+    """
+    Number of non-blank reviews. Spools hold no blank lines.
+    """
+    if isinstance(reviews, ReviewSpool):
+        return len(reviews)
+    return sum(1 for review in reviews.split("\n") if review.strip())
+
+
+def has_reviews(reviews):
+    if isinstance(reviews, ReviewSpool):
+        return len(reviews) > 0
+    return bool(reviews.strip())